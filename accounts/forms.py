@@ -3,7 +3,7 @@ from django.forms.utils import ErrorList
 from django.utils.safestring import mark_safe
 from django import forms
 from django.core.validators import RegexValidator
-from .models import Profile
+from .models import RECRUITER_FIELDS, Profile
 from django.contrib.auth.models import User
 
 
@@ -131,18 +131,11 @@ class PrivacySettingsForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        checkbox_fields = [
-            "show_email_to_recruiters",
-            "show_phone_to_recruiters",
-            "show_resume_to_recruiters",
-            "show_education_to_recruiters",
-            "show_experience_to_recruiters",
-            "show_location_to_recruiters",
-            "show_skills_to_recruiters",
-            "show_projects_to_recruiters",
-            "show_firstName_to_recruiters",
-            "show_lastName_to_recruiters",
-        ]
+        checkbox_fields = [f"show_{key}_to_recruiters" for key in RECRUITER_FIELDS]
+        if self.instance.pk and not self.is_bound:
+            # Ticked boxes come from the recruiter_fields mask; save() writes it back
+            for key, name in zip(RECRUITER_FIELDS, checkbox_fields):
+                self.initial[name] = self.instance.shows_to_recruiters(key)
 
         for name, field in self.fields.items():
             widget = field.widget
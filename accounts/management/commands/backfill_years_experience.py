@@ -0,0 +1,41 @@
+"""
+Management command to fill Profile.years_experience from the experience text.
+"""
+from django.core.management.base import BaseCommand
+from accounts.models import Profile, extract_years_experience
+
+
+class Command(BaseCommand):
+    help = 'Parse years of experience from every profile into the indexed years_experience column'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Profiles updated per statement',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        changed = []
+        total = 0
+
+        profiles = Profile.objects.only('id', 'experience', 'years_experience').order_by('id')
+        for profile in profiles.iterator(chunk_size=batch_size):
+            years = extract_years_experience(profile.experience)
+            if years != profile.years_experience:
+                profile.years_experience = years
+                changed.append(profile)
+            if len(changed) >= batch_size:
+                Profile.objects.bulk_update(changed, ['years_experience'])
+                total += len(changed)
+                changed = []
+
+        if changed:
+            Profile.objects.bulk_update(changed, ['years_experience'])
+            total += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Updated years_experience on {total} profiles'))
+        if total:
+            self.stdout.write('Run "manage.py run_saved_searches --force --full" to re-evaluate saved searches.')
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='years_experience',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+    ]
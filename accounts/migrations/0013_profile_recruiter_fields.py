@@ -0,0 +1,59 @@
+from django.db import migrations, models
+
+# Frozen copies of the schema at this point; migrations must not import
+# runtime modules whose constants and models keep changing.
+PROFILE_FTS_TABLE = 'accounts_profile_fts'
+PROFILE_FTS_COLUMNS = ('headline', 'skills', 'projects', 'experience', 'education')
+RECRUITER_FIELDS = (
+    "email", "phone", "resume", "education", "experience",
+    "location", "skills", "projects", "firstName", "lastName",
+)
+
+
+def backfill_recruiter_fields(apps, schema_editor):
+    Profile = apps.get_model('accounts', 'Profile')
+    profiles = list(Profile.objects.all())
+    for profile in profiles:
+        profile.recruiter_fields = sum(
+            1 << i for i, key in enumerate(RECRUITER_FIELDS)
+            if getattr(profile, f"show_{key}_to_recruiters")
+        )
+    Profile.objects.bulk_update(profiles, ['recruiter_fields'], batch_size=500)
+
+
+def reinstall_profile_fts(apps, schema_editor):
+    # SQLite adds the column by rebuilding accounts_profile, which drops the FTS sync triggers
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    table, cols = PROFILE_FTS_TABLE, ', '.join(PROFILE_FTS_COLUMNS)
+    new = ', '.join(f'new.{c}' for c in PROFILE_FTS_COLUMNS)
+    old = ', '.join(f'old.{c}' for c in PROFILE_FTS_COLUMNS)
+    for sql in (
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON accounts_profile BEGIN "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON accounts_profile BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE ON accounts_profile BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_profile_years_experience'),
+        ('home', '0017_profile_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='recruiter_fields',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_recruiter_fields, migrations.RunPython.noop),
+        migrations.RunPython(reinstall_profile_fts, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,49 @@
 # accounts/models.py
+import re
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 
+# "5 years", "3+ yrs", "10 yr" -> the number; the largest mention wins
+YEARS_EXPERIENCE_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+
+def extract_years_experience(text) -> int:
+    return max((int(n) for n in YEARS_EXPERIENCE_RE.findall(text or "")), default=0)
+
+# Fields a candidate can share with recruiters, in Profile.recruiter_fields bit order.
+# Append only: a bit's position is stored in the database.
+RECRUITER_FIELDS = (
+    "email", "phone", "resume", "education", "experience",
+    "location", "skills", "projects", "firstName", "lastName",
+)
+RECRUITER_FIELD_BITS = {key: 1 << i for i, key in enumerate(RECRUITER_FIELDS)}
+ALL_RECRUITER_FIELDS = (1 << len(RECRUITER_FIELDS)) - 1
+
+def recruiter_fields_mask(*keys) -> int:
+    mask = 0
+    for key in keys:
+        mask |= RECRUITER_FIELD_BITS[key]
+    return mask
+
+def shares_recruiter_fields(*keys) -> models.Q:
+    """
+    Q for profiles that share every one of `keys`. Spelled as an IN over
+    all masks with those bits set, so it's a plain lookup on the indexed
+    column rather than a bitwise expression the index can't serve.
+    """
+    mask = recruiter_fields_mask(*keys)
+    rest = ALL_RECRUITER_FIELDS & ~mask
+    supersets, sub = [], rest
+    while True:
+        supersets.append(mask | sub)
+        if not sub:
+            break
+        sub = (sub - 1) & rest
+    return models.Q(recruiter_fields__in=sorted(supersets))
+
 class Profile(models.Model):
     class Visibility(models.TextChoices):
         PUBLIC = "PUBLIC", "Public"
@@ -46,10 +85,37 @@ class Profile(models.Model):
 
     #users last action
     last_active = models.DateTimeField(null=True, blank=True)
+    # watermark for incremental saved-search runs
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # parsed from experience on save so it can be range-filtered by index
+    years_experience = models.PositiveSmallIntegerField(default=0, db_index=True)
+    # the show_*_to_recruiters toggles as one RECRUITER_FIELD_BITS mask, set on save
+    recruiter_fields = models.PositiveSmallIntegerField(default=0, db_index=True)
 
     def __str__(self):
         return f"{self.user.username} - {'Recruiter' if self.is_recruiter else 'Candidate'}"
 
+    def save(self, *args, **kwargs):
+        self.years_experience = extract_years_experience(self.experience)
+        self.recruiter_fields = recruiter_fields_mask(
+            *(key for key in RECRUITER_FIELDS if getattr(self, f"show_{key}_to_recruiters"))
+        )
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            derived = set()
+            if "experience" in update_fields:
+                derived.add("years_experience")
+            if any(f.startswith("show_") for f in update_fields):
+                derived.add("recruiter_fields")
+            if update_fields:
+                # auto_now is only written when listed; saved-search delta runs watermark on it
+                derived.add("updated_at")
+            kwargs["update_fields"] = {*update_fields, *derived}
+        super().save(*args, **kwargs)
+
+    def shows_to_recruiters(self, key: str) -> bool:
+        return bool(self.recruiter_fields & RECRUITER_FIELD_BITS[key])
+
     # Simple policy helper
     def can_view(self, viewer, field_key: str) -> bool:
         # Owner/Admin always see all fields
@@ -67,10 +133,9 @@ class Profile(models.Model):
                 return False
 
         # Only recruiter-visible fields are governed by toggles
-        sensitive = {"firstName", "lastName", "email", "phone", "resume", "education", "experience", "locations", "skills", "projects"}
-        if field_key in sensitive:
+        if field_key in RECRUITER_FIELD_BITS:
             if is_viewer_recruiter:
-                return getattr(self, f"show_{field_key}_to_recruiters", False)
+                return self.shows_to_recruiters(field_key)
             # Non-recruiters never see sensitive details
             return False
 
@@ -4,4 +4,5 @@ from home.models import SavedCandidateSearch
 class SavedCandidateSearchForm(forms.ModelForm):
     class Meta:
         model = SavedCandidateSearch
-        fields = ["name", "keywords", "location", "min_years_experience", "is_active"]
+        fields = ["name", "keywords", "fuzzy", "location", "min_years_experience", "is_active"]
+        labels = {"fuzzy": "Also match misspellings"}
@@ -2,9 +2,8 @@
 Management command to geocode all jobs that don't have coordinates.
 """
 from django.core.management.base import BaseCommand
-from django.conf import settings
 from home.models import Job
-import requests
+from home.services.geocoding import cached_geocode, geocode_location
 import time
 
 
@@ -18,34 +17,6 @@ class Command(BaseCommand):
             help='Show what would be geocoded without making changes',
         )
 
-    def geocode_location(self, address):
-        """Geocode an address using Google Maps API."""
-        if not address:
-            return None, None
-
-        url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {"address": address, "key": settings.GOOGLE_MAPS_API_KEY}
-
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-
-            if data["status"] == "OK":
-                loc = data["results"][0]["geometry"]["location"]
-                return float(loc["lat"]), float(loc["lng"])
-            else:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f'    Geocoding failed for "{address}": {data["status"]} - {data.get("error_message", "")}'
-                    )
-                )
-                return None, None
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'    Error geocoding "{address}": {str(e)}')
-            )
-            return None, None
-
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         
@@ -74,7 +45,9 @@ class Command(BaseCommand):
                 skipped_count += 1
                 continue
 
-            lat, lng = self.geocode_location(job.location)
+            # Repeated locations come from the geocode cache without an API call
+            cached = cached_geocode(job.location)
+            lat, lng = cached if cached is not None else geocode_location(job.location)
             
             if lat is not None and lng is not None:
                 self.stdout.write(
@@ -88,13 +61,14 @@ class Command(BaseCommand):
                     self.stdout.write(self.style.SUCCESS(f'    ✓ Saved to database'))
                 
                 geocoded_count += 1
-                
-                # Rate limiting: sleep to avoid hitting API limits
-                if i < total_jobs:
-                    time.sleep(0.2)  # 5 requests per second max
             else:
+                self.stdout.write(self.style.WARNING(f'    Could not geocode "{job.location}"'))
                 failed_count += 1
 
+            # Rate limiting: sleep to avoid hitting API limits
+            if cached is None and i < total_jobs:
+                time.sleep(0.2)  # 5 requests per second max
+
         # Summary
         self.stdout.write('\n' + '=' * 70)
         self.stdout.write(self.style.SUCCESS('GEOCODING SUMMARY'))
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.contrib.auth.models import User
 from accounts.models import Profile
 
@@ -170,30 +171,32 @@ class Command(BaseCommand):
         ]
 
         created_count = 0
-        for candidate_data in fake_candidates:
-            profile_data = candidate_data.pop('profile')
-            password = candidate_data.pop('password')
+        # One transaction so saved-search reindexing runs once for the whole batch
+        with transaction.atomic():
+            for candidate_data in fake_candidates:
+                profile_data = candidate_data.pop('profile')
+                password = candidate_data.pop('password')
 
-            user, created = User.objects.get_or_create(
-                username=candidate_data['username'],
-                defaults=candidate_data
-            )
+                user, created = User.objects.get_or_create(
+                    username=candidate_data['username'],
+                    defaults=candidate_data
+                )
 
-            if created:
-                user.set_password(password)
-                user.save()
+                if created:
+                    user.set_password(password)
+                    user.save()
 
-                # Update profile
-                profile = user.profile
-                for key, value in profile_data.items():
-                    setattr(profile, key, value)
-                profile.is_recruiter = False
-                profile.save()
+                    # Update profile
+                    profile = user.profile
+                    for key, value in profile_data.items():
+                        setattr(profile, key, value)
+                    profile.is_recruiter = False
+                    profile.save()
 
-                created_count += 1
-                self.stdout.write(self.style.SUCCESS(f'✓ Created: {user.username}'))
-            else:
-                self.stdout.write(self.style.WARNING(f'○ Already exists: {user.username}'))
+                    created_count += 1
+                    self.stdout.write(self.style.SUCCESS(f'✓ Created: {user.username}'))
+                else:
+                    self.stdout.write(self.style.WARNING(f'○ Already exists: {user.username}'))
 
         self.stdout.write(self.style.SUCCESS(f'\n{created_count} new candidate profiles created!'))
         self.stdout.write(self.style.SUCCESS(f'All passwords: "demo123"'))
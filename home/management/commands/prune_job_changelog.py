@@ -0,0 +1,27 @@
+"""
+Management command to delete old JobChangeLog entries.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home.services.job_snapshot import CHANGE_LOG_RETENTION, prune_change_log
+
+
+class Command(BaseCommand):
+    help = 'Delete job change log entries older than the retention period (run daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=CHANGE_LOG_RETENTION.total_seconds() / 3600,
+            help='Keep entries from this many recent hours',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            n = prune_change_log(timedelta(hours=options['hours']))
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'✓ Pruned {n} change log entries'))
@@ -0,0 +1,16 @@
+"""
+Management command to recount the materialized job search facets.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from home.services.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = 'Recount JobFacetCount rows from the job table (after bulk imports that skip signals)'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            n = rebuild_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {n} facet counts'))
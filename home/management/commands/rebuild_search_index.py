@@ -0,0 +1,40 @@
+"""
+Management command to (re)create and repopulate the search indexes: the
+SQLite full-text tables and the fuzzy-search trigram vocabulary.
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from accounts.models import Profile
+from home.models import Job
+from home.services.candidate_search import PROFILE_FTS_INDEXED_COLUMNS, PROFILE_FTS_TABLE
+from home.services.fulltext import install_fts
+from home.services.fuzzy import Source, rebuild_trigram_index
+from home.services.job_search import JOB_FTS_COLUMNS, JOB_FTS_TABLE
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text indexes and their sync triggers and the trigram vocabulary, then reindex every row'
+
+    def handle(self, *args, **options):
+        # Also drops words that no longer appear anywhere
+        terms = rebuild_trigram_index({
+            Source.JOB_TITLE: Job.objects.values_list('title', flat=True).iterator(),
+            Source.JOB_CATEGORY: Job.objects.values_list('category', flat=True).iterator(),
+            Source.PROFILE_SKILLS: Profile.objects.values_list('skills', flat=True).iterator(),
+        })
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt trigram index ({terms} words)'))
+
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING('Full-text indexes are SQLite-only; skipping them.'))
+            return
+
+        # Table rebuilds during migrations can drop the triggers, so recreate them too
+        indexes = [
+            (JOB_FTS_TABLE, 'home_job', JOB_FTS_COLUMNS),
+            (PROFILE_FTS_TABLE, 'accounts_profile', PROFILE_FTS_INDEXED_COLUMNS),
+        ]
+        for table, content_table, columns in indexes:
+            with connection.schema_editor() as schema_editor:
+                install_fts(schema_editor, table, content_table, columns)
+            self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {table}'))
@@ -0,0 +1,94 @@
+"""
+Management command to run due saved candidate searches in bulk.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from home.models import SavedCandidateSearch
+from home.services.saved_searches import find_new_matches, record_search_run
+
+
+class Command(BaseCommand):
+    help = 'Run active saved candidate searches whose last run is older than their interval'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Threads running the read-side queries (1 runs everything inline)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rescan every profile instead of only those changed since the last run',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run every active search regardless of its interval',
+        )
+
+    def due_searches(self, force):
+        now = timezone.now()
+        active = SavedCandidateSearch.objects.filter(is_active=True).select_related('owner')
+        return [
+            s for s in active
+            if force
+            or s.last_run_at is None
+            or s.last_run_at <= now - timedelta(minutes=s.run_interval_minutes)
+        ]
+
+    def find(self, search, full):
+        """Read-only work for one search, timed; runs on a worker thread."""
+        start = time.perf_counter()
+        try:
+            run = find_new_matches(search, full=full)
+        finally:
+            # each worker thread opened its own connection
+            if self.workers > 1:
+                connection.close()
+        return run, (time.perf_counter() - start) * 1000
+
+    def handle(self, *args, **options):
+        self.workers = max(1, options['workers'])
+        searches = self.due_searches(options['force'])
+
+        if not searches:
+            self.stdout.write(self.style.SUCCESS('No saved searches are due.'))
+            return
+
+        self.stdout.write(f'Running {len(searches)} saved searches with {self.workers} worker(s)...')
+        started = time.perf_counter()
+        total_new = 0
+
+        # Reads fan out across the pool; this thread is the single writer
+        if self.workers == 1:
+            results = (self.find(s, options['full']) for s in searches)
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.workers)
+            futures = [pool.submit(self.find, s, options['full']) for s in searches]
+            results = (f.result() for f in as_completed(futures))
+
+        for run, read_ms in results:
+            write_start = time.perf_counter()
+            new_count = record_search_run(run)
+            write_ms = (time.perf_counter() - write_start) * 1000
+            total_new += new_count
+            self.stdout.write(
+                f'  ✓ {run.search.name} ({run.search.owner.username}): '
+                f'{new_count} new match(es), read {read_ms:.1f}ms, write {write_ms:.1f}ms'
+            )
+
+        if self.workers > 1:
+            pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✓ Ran {len(searches)} searches in {elapsed:.2f}s, {total_new} new matches'
+        ))
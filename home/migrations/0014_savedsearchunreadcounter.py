@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unread_counts(apps, schema_editor):
+    SavedCandidateMatch = apps.get_model('home', 'SavedCandidateMatch')
+    SavedSearchUnreadCounter = apps.get_model('home', 'SavedSearchUnreadCounter')
+    rows = (
+        SavedCandidateMatch.objects.filter(seen=False)
+        .values('search__owner_id')
+        .annotate(n=Count('id'))
+    )
+    SavedSearchUnreadCounter.objects.bulk_create([
+        SavedSearchUnreadCounter(owner_id=row['search__owner_id'], unread_count=row['n'])
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0013_rename_longtitude_job_longitude'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearchUnreadCounter',
+            fields=[
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='saved_search_unread', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0014_savedsearchunreadcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savedcandidatesearch',
+            name='run_interval_minutes',
+            field=models.PositiveIntegerField(default=60),
+        ),
+    ]
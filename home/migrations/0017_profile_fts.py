@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# Frozen copies of the schema at this point; migrations must not import
+# runtime modules whose constants and models keep changing.
+PROFILE_FTS_TABLE = 'accounts_profile_fts'
+PROFILE_FTS_COLUMNS = ('headline', 'skills', 'projects', 'experience', 'education')
+
+
+def fts_schema(table, content_table, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        f"{cols}, content='{content_table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {content_table} BEGIN "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {content_table} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE ON {content_table} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ]
+
+
+def create_profile_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in fts_schema(PROFILE_FTS_TABLE, 'accounts_profile', PROFILE_FTS_COLUMNS):
+        schema_editor.execute(sql)
+
+
+def drop_profile_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {PROFILE_FTS_TABLE}_{suffix}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {PROFILE_FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0016_job_fts'),
+        ('accounts', '0012_profile_years_experience'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_profile_fts, drop_profile_fts),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0017_profile_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['date', 'id'], name='home_job_date_135941_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['salary', 'id'], name='home_job_salary_f5f354_idx'),
+        ),
+    ]
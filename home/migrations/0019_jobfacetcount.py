@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:56
+
+from collections import Counter
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# Frozen copy of the facet bucketing at this point; migrations must not
+# import runtime modules whose constants and models keep changing.
+SALARY_BUCKETS = (0, 50000, 100000, 150000, 200000)
+
+
+def facet_values(category, location, salary):
+    salary = max(Decimal(salary or 0), 0)
+    lower = max(b for b in SALARY_BUCKETS if b <= salary)
+    i = SALARY_BUCKETS.index(lower)
+    values = [('salary', f'{lower}-{SALARY_BUCKETS[i + 1]}' if i + 1 < len(SALARY_BUCKETS) else f'{lower}+')]
+    category = ' '.join((category or '').split())[:128]
+    if category:
+        values.append(('category', category))
+    if city := ' '.join((location or '').split(',')[0].split()).title()[:128]:
+        values.append(('location', city))
+    return values
+
+
+def backfill_facet_counts(apps, schema_editor):
+    Job = apps.get_model('home', 'Job')
+    JobFacetCount = apps.get_model('home', 'JobFacetCount')
+    counts = Counter()
+    for row in Job.objects.values_list('category', 'location', 'salary').iterator():
+        counts.update(facet_values(*row))
+    JobFacetCount.objects.bulk_create([
+        JobFacetCount(facet=facet, value=value, count=n)
+        for (facet, value), n in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0018_job_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('category', 'Category'), ('location', 'Location'), ('salary', 'Salary')], max_length=16)),
+                ('value', models.CharField(max_length=128)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['facet', '-count'], name='home_jobfac_facet_62ab84_idx')],
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(backfill_facet_counts, migrations.RunPython.noop),
+    ]
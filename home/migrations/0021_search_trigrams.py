@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:07
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copies of the tokenizer at this point; migrations must not import
+# runtime modules whose constants and models keep changing.
+MAX_TERM_LENGTH = 64
+TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def text_tokens(text):
+    decomposed = unicodedata.normalize('NFKD', (text or '').lower())
+    return TOKEN_RE.findall(''.join(c for c in decomposed if not unicodedata.combining(c)))
+
+
+def term_trigrams(term):
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def backfill_search_trigrams(apps, schema_editor):
+    Job = apps.get_model('home', 'Job')
+    Profile = apps.get_model('accounts', 'Profile')
+    SearchTrigram = apps.get_model('home', 'SearchTrigram')
+    sources = {
+        'job_title': Job.objects.values_list('title', flat=True),
+        'job_category': Job.objects.values_list('category', flat=True),
+        'profile_skills': Profile.objects.values_list('skills', flat=True),
+    }
+    for source, texts in sources.items():
+        terms = {t for text in texts.iterator() for t in text_tokens(text) if len(t) <= MAX_TERM_LENGTH}
+        SearchTrigram.objects.bulk_create(
+            [SearchTrigram(source=source, trigram=g, term=t) for t in terms for g in term_trigrams(t)],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0020_jobchangelog'),
+        ('accounts', '0012_profile_years_experience'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='savedcandidatesearch',
+            name='fuzzy',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('job_title', 'Job title'), ('job_category', 'Job category'), ('profile_skills', 'Profile skills')], max_length=16)),
+                ('trigram', models.CharField(max_length=3)),
+                ('term', models.CharField(max_length=64)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source', 'term'], name='home_search_source_9b2290_idx')],
+                'unique_together': {('source', 'trigram', 'term')},
+            },
+        ),
+        migrations.RunPython(backfill_search_trigrams, migrations.RunPython.noop),
+    ]
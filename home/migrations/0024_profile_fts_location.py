@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Frozen copies of the schema at this point; migrations must not import
+# runtime modules whose constants and models keep changing.
+PROFILE_FTS_TABLE = 'accounts_profile_fts'
+OLD_COLUMNS = ('headline', 'skills', 'projects', 'experience', 'education')
+NEW_COLUMNS = OLD_COLUMNS + ('location',)
+
+
+def fts_schema(table, content_table, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    return [
+        *(f'DROP TRIGGER IF EXISTS {table}_{suffix}' for suffix in ('ai', 'ad', 'au')),
+        f'DROP TABLE IF EXISTS {table}',
+        f"CREATE VIRTUAL TABLE {table} USING fts5("
+        f"{cols}, content='{content_table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER {table}_ai AFTER INSERT ON {content_table} BEGIN "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {table}_ad AFTER DELETE ON {content_table} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {table}_au AFTER UPDATE ON {content_table} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ]
+
+
+def index_location(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in fts_schema(PROFILE_FTS_TABLE, 'accounts_profile', NEW_COLUMNS):
+        schema_editor.execute(sql)
+
+
+def unindex_location(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in fts_schema(PROFILE_FTS_TABLE, 'accounts_profile', OLD_COLUMNS):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0023_geocodecache'),
+        ('accounts', '0013_profile_recruiter_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_location, unindex_location),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+# Frozen copies of the schema at this point; migrations must not import
+# runtime modules whose constants and models keep changing.
+FTS_INDEXES = (
+    ('home_job_fts', 'home_job', ('title', 'description', 'category', 'location')),
+    ('accounts_profile_fts', 'accounts_profile',
+     ('headline', 'skills', 'projects', 'experience', 'education', 'location')),
+)
+
+
+def update_trigger(table, content_table, columns, of_columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    event = f'UPDATE OF {cols}' if of_columns else 'UPDATE'
+    return [
+        f'DROP TRIGGER IF EXISTS {table}_au',
+        f"CREATE TRIGGER {table}_au AFTER {event} ON {content_table} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+def reindex_on_indexed_columns_only(apps, schema_editor):
+    # Writes to last_active (every request) or latitude/longitude used to
+    # delete and reinsert the row's FTS entry
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, content_table, columns in FTS_INDEXES:
+        for sql in update_trigger(table, content_table, columns, of_columns=True):
+            schema_editor.execute(sql)
+
+
+def reindex_on_every_update(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, content_table, columns in FTS_INDEXES:
+        for sql in update_trigger(table, content_table, columns, of_columns=False):
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0024_profile_fts_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_on_indexed_columns_only, reindex_on_every_update),
+    ]
@@ -1,8 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
-import requests
-from django.conf import settings
 
 # Create your models here.
 class Job(models.Model):
@@ -17,7 +15,16 @@ class Job(models.Model):
     #extra info for map api
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
-    
+
+    class Meta:
+        # Keyset pagination on the job board; SQLite walks these in either direction
+        indexes = [
+            models.Index(fields=["date", "id"]),
+            models.Index(fields=["salary", "id"]),
+            # A recruiter's own jobs, newest first
+            models.Index(fields=["user", "-date"]),
+        ]
+
     def __str__(self):
         return str(self.id) + ' - ' + self.title
 
@@ -46,6 +53,10 @@ class Application(models.Model):
     class Meta:
         unique_together = ("job", "applicant")
         ordering = ["-created_at"]
+        indexes = [
+            # A job's pipeline, one status column at a time
+            models.Index(fields=["job", "status", "-created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.applicant.username} -> {self.job.title}"
@@ -105,6 +116,10 @@ class SavedCandidateSearch(models.Model):
     location = models.CharField(max_length=255, blank=True)
     min_years_experience = models.PositiveIntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    # how often the run_saved_searches command re-runs this search
+    run_interval_minutes = models.PositiveIntegerField(default=60)
+    # also match close misspellings of the keywords (see home.services.fuzzy)
+    fuzzy = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -138,14 +153,92 @@ class SavedCandidateMatch(models.Model):
         return f"{self.search.name} -> {self.candidate.username}"
 
 
+# Denormalized unread-match count per recruiter so the notification badge
+# poll is a single primary-key read instead of a COUNT over a join.
+# Kept in step with F() updates wherever matches are recorded, retracted or marked seen.
+class SavedSearchUnreadCounter(models.Model):
+    owner = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="saved_search_unread")
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.owner.username}: {self.unread_count} unread"
+
+
+class JobFacetCount(models.Model):
+    """
+    Materialized job counts per search facet value, kept current by the Job
+    signals in home.signals (see home.services.facets).
+    """
+    class Facet(models.TextChoices):
+        CATEGORY = "category", "Category"
+        LOCATION = "location", "Location"
+        SALARY = "salary", "Salary"
+
+    facet = models.CharField(max_length=16, choices=Facet.choices)
+    value = models.CharField(max_length=128)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("facet", "value")
+        indexes = [
+            models.Index(fields=["facet", "-count"]),
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
 
 
-def geocode_location(address):
-    api_key = settings.GOOGLE_MAPS_API_KEY
-    url = f"https://maps.googleapis.com/maps/api/geocode/json?address={address}&key={api_key}"
-    response = requests.get(url).json()
+class SearchTrigram(models.Model):
+    """
+    Trigram postings over the distinct words of a searchable field, used to
+    find spelling variants of a query word (see home.services.fuzzy).
+    """
+    class Source(models.TextChoices):
+        JOB_TITLE = "job_title", "Job title"
+        JOB_CATEGORY = "job_category", "Job category"
+        PROFILE_SKILLS = "profile_skills", "Profile skills"
 
-    if response['status'] == 'OK':
-        location = response['results'][0]['geometry']['location']
-        return location['lat'], location['lng']
-    return None, None
\ No newline at end of file
+    source = models.CharField(max_length=16, choices=Source.choices)
+    trigram = models.CharField(max_length=3)
+    term = models.CharField(max_length=64)
+
+    class Meta:
+        # Also serves the (source, trigram) posting lookups
+        unique_together = ("source", "trigram", "term")
+        indexes = [
+            models.Index(fields=["source", "term"]),
+        ]
+
+    def __str__(self):
+        return f"{self.source}:{self.trigram} -> {self.term}"
+
+
+class JobChangeLog(models.Model):
+    """
+    Append-only log of Job ids that were saved or deleted, written by the Job
+    signals. Per-process read models (home.services.job_snapshot) replay it
+    to pick up changes without reloading the whole table.
+    """
+    job_id = models.IntegerField()
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.id}: job {self.job_id}"
+
+
+
+class GeocodeCache(models.Model):
+    """
+    Google Geocoding answers keyed by normalized address, including misses
+    (no coordinates), so repeat lookups skip the API until `expires_at`.
+    Read through home.services.geocoding.
+    """
+    address = models.CharField(max_length=255, unique=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    # Geocoding API status, or ERROR when the request itself failed
+    status = models.CharField(max_length=32)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.address}: {self.status}"
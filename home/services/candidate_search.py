@@ -0,0 +1,40 @@
+from django.db.models.expressions import RawSQL
+
+from home.services.fulltext import fts_available, fts_match_expression, icontains_any, prefix_match
+
+# SQLite FTS5 index over candidate Profile text; see home.services.fulltext.
+# It only answers "which profiles mention these words"; visibility and the
+# other recruiter filters stay ordinary ORM predicates on accounts_profile.
+PROFILE_FTS_TABLE = "accounts_profile_fts"
+# What keyword searches look at; location is indexed too, for the location filter
+PROFILE_FTS_COLUMNS = ("headline", "skills", "projects", "experience", "education")
+PROFILE_FTS_INDEXED_COLUMNS = PROFILE_FTS_COLUMNS + ("location",)
+
+
+def profile_fts_available() -> bool:
+    return fts_available(PROFILE_FTS_TABLE)
+
+
+def filter_profiles_by_keywords(profiles, term, columns=PROFILE_FTS_COLUMNS):
+    """
+    Keep profiles whose text matches every word of `term` (free text or
+    query_groups) in the given columns.
+    """
+    if not profile_fts_available():
+        return profiles.filter(icontains_any(term, columns))
+
+    match = fts_match_expression(term, columns if tuple(columns) != PROFILE_FTS_INDEXED_COLUMNS else None)
+    if match is None:
+        return profiles.none()
+    return profiles.filter(pk__in=RawSQL(
+        f"SELECT rowid FROM {PROFILE_FTS_TABLE} WHERE {PROFILE_FTS_TABLE} MATCH %s", [match]
+    ))
+
+
+def profile_matches_keywords(prof, term, columns=PROFILE_FTS_COLUMNS) -> bool:
+    """In-memory twin of filter_profiles_by_keywords for a single profile."""
+    values = [getattr(prof, c) or "" for c in columns]
+    if not profile_fts_available():
+        groups = [[term]] if isinstance(term, str) else term
+        return all(any(w.lower() in v.lower() for w in group for v in values) for group in groups)
+    return prefix_match(" ".join(values), term)
@@ -0,0 +1,110 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from home.models import Job, JobFacetCount
+
+Facet = JobFacetCount.Facet
+
+# Lower bounds of the salary ranges shown on the job board
+SALARY_BUCKETS = (0, 50000, 100000, 150000, 200000)
+FACET_LIMIT = 8
+
+
+def canonical_location(location) -> str:
+    """'  atlanta,  GA ' and 'Atlanta' both count as 'Atlanta'."""
+    city = (location or "").split(",")[0]
+    return " ".join(city.split()).title()
+
+
+def salary_bucket(salary) -> str:
+    salary = max(Decimal(salary or 0), 0)
+    lower = max(b for b in SALARY_BUCKETS if b <= salary)
+    i = SALARY_BUCKETS.index(lower)
+    if i + 1 < len(SALARY_BUCKETS):
+        return f"{lower}-{SALARY_BUCKETS[i + 1]}"
+    return f"{lower}+"
+
+
+def salary_bucket_bounds(bucket):
+    """'50000-100000' -> ('50000', '99999.99'); '200000+' -> ('200000', '')."""
+    if bucket.endswith("+"):
+        return bucket[:-1], ""
+    lower, upper = bucket.split("-")
+    return lower, str(Decimal(upper) - Decimal("0.01"))
+
+
+def facet_values(category, location, salary) -> list:
+    values = [(Facet.SALARY, salary_bucket(salary))]
+    category = " ".join((category or "").split())[:128]
+    if category:
+        values.append((Facet.CATEGORY, category))
+    if city := canonical_location(location)[:128]:
+        values.append((Facet.LOCATION, city))
+    return values
+
+
+def job_facet_values(job) -> list:
+    return facet_values(job.category, job.location, job.salary)
+
+
+def adjust_facet_counts(removed=(), added=()):
+    """Move counts from one job's old facet values to its new ones."""
+    deltas = Counter(added)
+    deltas.subtract(Counter(removed))
+    for (facet, value), delta in deltas.items():
+        if not delta:
+            continue
+        updated = JobFacetCount.objects.filter(facet=facet, value=value).update(
+            count=Greatest(F("count") + delta, 0)
+        )
+        if not updated and delta > 0:
+            _, created = JobFacetCount.objects.get_or_create(
+                facet=facet, value=value, defaults={"count": delta}
+            )
+            if not created:
+                JobFacetCount.objects.filter(facet=facet, value=value).update(count=F("count") + delta)
+
+
+def rebuild_facet_counts() -> int:
+    """Recount from scratch, e.g. after bulk writes that skipped the signals."""
+    counts = Counter()
+    for row in Job.objects.order_by().values_list("category", "location", "salary").iterator():
+        counts.update(facet_values(*row))
+    JobFacetCount.objects.all().delete()
+    JobFacetCount.objects.bulk_create(
+        [JobFacetCount(facet=f, value=v, count=n) for (f, v), n in counts.items() if n],
+        batch_size=500,
+    )
+    return len(counts)
+
+
+def stored_facet_counts(limit=FACET_LIMIT) -> dict:
+    """{facet: [(value, count), ...]} for the whole job table, from the summary rows."""
+    return {
+        facet: list(
+            JobFacetCount.objects.filter(facet=facet, count__gt=0)
+            .order_by("-count", "value")
+            .values_list("value", "count")[:limit]
+        )
+        for facet in Facet.values
+    }
+
+
+def filtered_facet_counts(jobs, limit=FACET_LIMIT) -> dict:
+    """
+    The same summary for a filtered job queryset. Meant for full-text
+    results, whose rows come from the FTS match set rather than a table
+    scan; only the three facet columns are read.
+    """
+    counts = defaultdict(Counter)
+    rows = jobs.order_by().values_list("category", "location", "salary")
+    for row in rows.iterator():
+        for facet, value in facet_values(*row):
+            counts[facet][value] += 1
+    return {
+        facet: sorted(counts[facet].items(), key=lambda vc: (-vc[1], vc[0]))[:limit]
+        for facet in Facet.values
+    }
@@ -0,0 +1,135 @@
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+
+# Helpers for SQLite FTS5 indexes kept in sync with their content table by
+# triggers. Other database backends don't get the tables; callers check
+# fts_available() and fall back to icontains lookups.
+
+# Mirrors FTS5's unicode61 tokenizer: letters and digits, underscore splits
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def fold(text) -> str:
+    """Lowercase and strip diacritics, as unicode61 remove_diacritics does."""
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def text_tokens(text) -> list:
+    return _TOKEN_RE.findall(fold(text))
+
+
+def query_groups(term) -> list:
+    """
+    Normalize a query to a list of word groups: every group must match and
+    any word within a group will do. Free text is one single-word group per
+    word; fuzzy search (home.services.fuzzy) passes groups with spelling
+    alternatives already expanded.
+    """
+    if isinstance(term, str):
+        return [[t] for t in text_tokens(term)]
+    # re-tokenize so every word is safe to quote in an FTS5 expression
+    groups = [[t for word in group for t in text_tokens(word)] for group in term]
+    return [group for group in groups if group]
+
+
+def prefix_match(text, term) -> bool:
+    """In-memory twin of an FTS5 match on fts_match_expression(term)."""
+    groups = query_groups(term)
+    if not groups:
+        return False
+    tokens = text_tokens(text)
+    return all(any(t.startswith(w) for t in tokens for w in group) for group in groups)
+
+
+def _fts_schema(table, content_table, columns):
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    # Triggers are replaced rather than kept, so a repair also picks up
+    # definition changes. The update trigger only fires when an indexed
+    # column is written, not on e.g. last_active or geocoding updates.
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        f"{cols}, content='{content_table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        *(f"DROP TRIGGER IF EXISTS {table}_{suffix}" for suffix in ("ai", "ad", "au")),
+        f"CREATE TRIGGER {table}_ai AFTER INSERT ON {content_table} BEGIN "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {table}_ad AFTER DELETE ON {content_table} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {table}_au AFTER UPDATE OF {cols} ON {content_table} BEGIN "
+        f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+def _drop_fts_schema(table):
+    return [f"DROP TRIGGER IF EXISTS {table}_{suffix}" for suffix in ("ai", "ad", "au")] + [
+        f"DROP TABLE IF EXISTS {table}"
+    ]
+
+
+def install_fts(schema_editor, table, content_table, columns):
+    """Create (or repair) an FTS table plus triggers, then reindex it. SQLite only."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in _fts_schema(table, content_table, columns):
+        schema_editor.execute(sql)
+    schema_editor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def uninstall_fts(schema_editor, table):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in _drop_fts_schema(table):
+        schema_editor.execute(sql)
+
+
+_installed = set()
+
+
+def fts_available(table) -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    if table not in _installed and table in connection.introspection.table_names():
+        _installed.add(table)
+    return table in _installed
+
+
+def fts_match_expression(term, columns=None):
+    """
+    Turn free text (or query_groups) into a safe FTS5 query: every word must
+    appear as a token prefix ("pyth dev" -> "pyth"* AND "dev"*), optionally
+    within columns. Returns None when the text has no searchable words.
+    """
+    groups = query_groups(term)
+    if not groups:
+        return None
+    parts = []
+    for group in groups:
+        alternatives = " OR ".join(f'"{w}"*' for w in group)
+        parts.append(f"({alternatives})" if len(group) > 1 else alternatives)
+    expr = " AND ".join(parts)
+    if columns:
+        return "{%s} : (%s)" % (" ".join(columns), expr)
+    return expr
+
+
+def icontains_any(term, columns) -> Q:
+    """
+    The non-SQLite fallback: substring match in any of the columns. Word
+    groups need every group to match, by any of its words.
+    """
+    if isinstance(term, str):
+        term = [[term]]
+    q = Q()
+    for group in term:
+        alternatives = Q()
+        for word in group:
+            for c in columns:
+                alternatives |= Q(**{f"{c}__icontains": word})
+        q &= alternatives
+    return q
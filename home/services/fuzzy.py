@@ -0,0 +1,104 @@
+from django.db.models import Count
+
+from home.models import SearchTrigram
+from home.services.fulltext import text_tokens
+
+Source = SearchTrigram.Source
+
+MAX_TERM_LENGTH = 64
+# Spelling alternatives added per query word, closest first
+MAX_ALTERNATIVES = 5
+
+
+def term_trigrams(term) -> set:
+    """Padded trigrams, as pg_trgm does: "go" -> {"  g", " go", "go "}."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(word) -> int:
+    # Short words have too many close neighbours to guess at
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def typo_distance(a, b) -> int:
+    """Edit distance counting an adjacent swap ("pyhton") as one typo."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _terms(texts) -> set:
+    return {t for text in texts for t in text_tokens(text) if len(t) <= MAX_TERM_LENGTH}
+
+
+def trigram_rows(source, terms) -> list:
+    return [SearchTrigram(source=source, trigram=g, term=t) for t in terms for g in term_trigrams(t)]
+
+
+def index_terms(source, *texts):
+    """Add any words of `texts` not yet in the source's vocabulary."""
+    terms = _terms(texts)
+    if not terms:
+        return
+    known = set(
+        SearchTrigram.objects.filter(source=source, term__in=terms).values_list("term", flat=True).distinct()
+    )
+    SearchTrigram.objects.bulk_create(
+        trigram_rows(source, terms - known), batch_size=500, ignore_conflicts=True
+    )
+
+
+def rebuild_trigram_index(sources_to_texts) -> int:
+    """Replace each source's vocabulary; {source: iterable of texts}. Drops words no longer used."""
+    total = 0
+    for source, texts in sources_to_texts.items():
+        terms = _terms(texts)
+        SearchTrigram.objects.filter(source=source).delete()
+        SearchTrigram.objects.bulk_create(trigram_rows(source, terms), batch_size=500)
+        total += len(terms)
+    return total
+
+
+def similar_terms(sources, word) -> list:
+    """
+    Vocabulary words within max_typos(word) of `word`, closest first. The
+    posting lookup keeps only words sharing enough trigrams to be that close
+    (an edit touches at most four trigrams); those few are then verified.
+    """
+    limit = max_typos(word)
+    if not limit or not sources:
+        return []
+    grams = term_trigrams(word)
+    shared = (
+        SearchTrigram.objects.filter(source__in=sources, trigram__in=grams)
+        .values("term")
+        .annotate(shared=Count("trigram", distinct=True))
+        .filter(shared__gte=max(1, len(grams) - 4 * limit))
+        .order_by("-shared")
+        .values_list("term", "shared")[:200]
+    )
+    scored = []
+    for term, n in shared:
+        if term != word and abs(len(term) - len(word)) <= limit:
+            distance = typo_distance(word, term)
+            if distance <= limit:
+                scored.append((distance, -n, term))
+    return [term for _, _, term in sorted(scored)[:MAX_ALTERNATIVES]]
+
+
+def fuzzy_groups(term, sources) -> list:
+    """
+    Expand free text into query_groups: each word plus its close spellings
+    from the given vocabularies, for search_jobs / filter_profiles_by_keywords.
+    """
+    return [[word] + similar_terms(sources, word) for word in text_tokens(term)]
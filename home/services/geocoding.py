@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from home.models import GeocodeCache
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+# Places rarely move; a miss may be a typo someone fixes; errors (quota,
+# network) are held back only long enough to stop a retry storm
+FOUND_TTL = timedelta(days=30)
+MISS_TTL = timedelta(days=1)
+ERROR_TTL = timedelta(minutes=5)
+MISS_STATUSES = {"ZERO_RESULTS", "INVALID_REQUEST"}
+LRU_SIZE = 1024
+ADDRESS_MAX_LENGTH = GeocodeCache._meta.get_field("address").max_length
+
+
+class _LRU:
+    """Bounded, thread-safe map of address -> (lat, lng, expires_at), least recently used out first."""
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[2] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[:2]
+
+    def put(self, key, lat, lng, expires_at):
+        with self._lock:
+            self._entries[key] = (lat, lng, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+geocode_lru = _LRU(LRU_SIZE)
+
+
+def normalize_address(address) -> str:
+    # "Atlanta,GA" / " atlanta,  ga " -> "atlanta, ga"
+    return " ".join((address or "").replace(",", ", ").split()).casefold().strip(" ,")
+
+
+def _fetch(address):
+    """(status, lat, lng) from the Geocoding API; status ERROR if the call itself failed."""
+    params = {"address": address, "key": settings.GOOGLE_MAPS_API_KEY}
+    try:
+        data = requests.get(GEOCODE_URL, params=params, timeout=10).json()
+    except (requests.RequestException, ValueError):
+        return "ERROR", None, None
+    status = data.get("status", "ERROR")
+    if status == "OK":
+        loc = data["results"][0]["geometry"]["location"]
+        return status, float(loc["lat"]), float(loc["lng"])
+    return status, None, None
+
+
+def cached_geocode(address):
+    """
+    (lat, lng) if the address has an unexpired answer in the LRU or the
+    GeocodeCache table, (None, None) for a cached miss, or None if it has
+    to be fetched.
+    """
+    key = normalize_address(address)
+    if not key:
+        return None, None
+    now = timezone.now()
+    hit = geocode_lru.get(key, now)
+    if hit is not None:
+        return hit
+    row = GeocodeCache.objects.filter(address=key, expires_at__gt=now).values_list(
+        "latitude", "longitude", "expires_at"
+    ).first()
+    if row is None:
+        return None
+    geocode_lru.put(key, *row)
+    return row[:2]
+
+
+def geocode_location(address):
+    """
+    Address -> (lat, lng), or (None, None) when it can't be placed. Answers,
+    misses and errors are all cached for their TTL, so only the first
+    lookup of an address pays for the API round trip.
+    """
+    hit = cached_geocode(address)
+    if hit is not None:
+        return hit
+
+    key = normalize_address(address)
+    status, lat, lng = _fetch(address.strip())
+    if status == "OK":
+        ttl = FOUND_TTL
+    else:
+        ttl = MISS_TTL if status in MISS_STATUSES else ERROR_TTL
+    expires_at = timezone.now() + ttl
+    if len(key) <= ADDRESS_MAX_LENGTH:
+        GeocodeCache.objects.update_or_create(
+            address=key,
+            defaults={"latitude": lat, "longitude": lng, "status": status, "expires_at": expires_at},
+        )
+    geocode_lru.put(key, lat, lng, expires_at)
+    return lat, lng
@@ -0,0 +1,71 @@
+import json
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from home.services.fulltext import fts_available, fts_match_expression, icontains_any
+from home.services.pagination import DEFAULT_PAGE_SIZE, KeysetPage, encode_cursor, load_cursor
+
+# SQLite FTS5 index over Job text; see home.services.fulltext.
+JOB_FTS_TABLE = "home_job_fts"
+JOB_FTS_COLUMNS = ("title", "description", "category", "location")
+# bm25 column weights, same order as JOB_FTS_COLUMNS: a title hit beats a description hit
+JOB_FTS_WEIGHTS = (10.0, 1.0, 4.0, 2.0)
+JOB_FTS_RANK = f"bm25({JOB_FTS_TABLE}, {', '.join(map(str, JOB_FTS_WEIGHTS))})"
+RANK_ORDERING = ("rank", "-id")
+
+
+def job_fts_available() -> bool:
+    return fts_available(JOB_FTS_TABLE)
+
+
+def search_jobs(jobs, term, columns=JOB_FTS_COLUMNS):
+    """
+    Filter a Job queryset by free text. On SQLite this joins the FTS index
+    and annotates a bm25 `rank` (lower is better); elsewhere it falls back to
+    icontains across the same columns.
+    """
+    if not job_fts_available():
+        return jobs.filter(icontains_any(term, columns))
+
+    match = fts_match_expression(term, columns if tuple(columns) != JOB_FTS_COLUMNS else None)
+    if match is None:
+        # Keep `rank` resolvable so relevance ordering of the empty result still works
+        return jobs.extra(select={"rank": "0"}).none()
+    return jobs.extra(
+        tables=[JOB_FTS_TABLE],
+        where=[f"{JOB_FTS_TABLE}.rowid = home_job.id", f"{JOB_FTS_TABLE} MATCH %s"],
+        params=[match],
+        select={"rank": JOB_FTS_RANK},
+    )
+
+
+def paginate_ranked_jobs(jobs, cursor=None, page_size=DEFAULT_PAGE_SIZE) -> KeysetPage:
+    """
+    paginate_keyset for search_jobs() results in relevance order. `rank` is
+    computed rather than a column, so the seek condition is raw SQL too.
+    """
+    qs = jobs.order_by(*RANK_ORDERING)
+    values = load_cursor(cursor)
+    if values and len(values) == 2:
+        try:
+            rank, last_id = float(values[0]), int(values[1])
+        except (TypeError, ValueError):
+            pass
+        else:
+            qs = qs.extra(
+                where=[f"({JOB_FTS_RANK} > %s OR ({JOB_FTS_RANK} = %s AND home_job.id < %s))"],
+                params=[rank, rank, last_id],
+            )
+    rows = list(qs[: page_size + 1])
+    page = KeysetPage(items=rows[:page_size])
+    if len(rows) > page_size:
+        page.next_cursor = encode_cursor(rows[page_size - 1], RANK_ORDERING)
+    return page
+
+
+def restrict_to_ids(jobs, ids):
+    """Filter to a possibly long id list; on SQLite it goes as one JSON parameter, not one per id."""
+    if connection.vendor == "sqlite":
+        return jobs.filter(pk__in=RawSQL("SELECT value FROM json_each(%s)", [json.dumps(list(ids))]))
+    return jobs.filter(pk__in=ids)
@@ -0,0 +1,515 @@
+import heapq
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from itertools import islice
+
+from django.utils import timezone
+
+from home.models import Job, JobChangeLog, JobFacetCount
+from home.services.facets import FACET_LIMIT, facet_values
+from home.services.fulltext import query_groups, text_tokens
+
+# Changes normally arrive through the change log; a periodic full reload
+# also catches bulk writes that skipped the Job signals.
+REBUILD_AFTER_SECONDS = 300
+# Replaying more changes than this is slower than reloading everything
+MAX_REPLAY = 2000
+# Columns the snapshot can answer token-prefix searches on
+SEARCHABLE_COLUMNS = ("title", "category", "location")
+EARTH_RADIUS_MILES = 3958.8
+# Typeahead tolerates this much lag so keystrokes don't each read the change log
+SUGGEST_MAX_AGE_SECONDS = 5
+# prune_change_log default; must comfortably exceed REBUILD_AFTER_SECONDS
+CHANGE_LOG_RETENTION = timedelta(days=1)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_LOAD_FIELDS = ("id", "salary", "date", "latitude", "longitude") + SEARCHABLE_COLUMNS
+# Dictionary-encoded facet columns
+_FACET_COLUMNS = {
+    JobFacetCount.Facet.CATEGORY: "category",
+    JobFacetCount.Facet.LOCATION: "location",
+    JobFacetCount.Facet.SALARY: "salary_range",
+}
+# Always kept, since salary filters are slices of it
+_SALARY_ORDER = ("salary", "id")
+
+
+def _micros(dt) -> int:
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt, dt_timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _cents(amount) -> int:
+    return int(Decimal(amount or 0) * 100)
+
+
+def haversine_miles(lat1, lon1, lat2, lon2) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(a))
+
+
+class _TokenIndex:
+    """Token -> rows postings with a sorted vocabulary for prefix lookups."""
+
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.row_tokens = {}
+        self._vocab = None
+
+    def put(self, row, text):
+        self.drop(row)
+        tokens = set(text_tokens(text))
+        self.row_tokens[row] = tokens
+        for t in tokens:
+            self.postings[t].add(row)
+        self._vocab = None
+
+    def drop(self, row):
+        for t in self.row_tokens.pop(row, ()):
+            self.postings[t].discard(row)
+            if not self.postings[t]:
+                del self.postings[t]
+                self._vocab = None
+
+    def prefixed(self, word) -> set:
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        rows = set()
+        for i in range(bisect_left(self._vocab, word), len(self._vocab)):
+            if not self._vocab[i].startswith(word):
+                break
+            rows |= self.postings[self._vocab[i]]
+        return rows
+
+
+class _SuggestionIndex:
+    """
+    Distinct field values with their job counts, plus a sorted array of
+    (folded text from each word start, column, value) for prefix lookups,
+    so "dev" finds "Python Developer". Keys are inserted and removed with
+    bisect as values appear and disappear.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.keys = []
+        # while loading, append unsorted and sort once at the end
+        self.loading = False
+
+    @staticmethod
+    def _keys(column, value):
+        tokens = text_tokens(value)
+        return [(" ".join(tokens[i:]), column, value) for i in range(len(tokens))]
+
+    def add(self, column, value):
+        if not value:
+            return
+        if not self.counts[(column, value)]:
+            for key in self._keys(column, value):
+                if self.loading:
+                    self.keys.append(key)
+                else:
+                    insort(self.keys, key)
+        self.counts[(column, value)] += 1
+
+    def finish_loading(self):
+        self.keys.sort()
+        self.loading = False
+
+    def remove(self, column, value):
+        if not value or not self.counts[(column, value)]:
+            return
+        self.counts[(column, value)] -= 1
+        if not self.counts[(column, value)]:
+            del self.counts[(column, value)]
+            for key in self._keys(column, value):
+                i = bisect_left(self.keys, key)
+                if i < len(self.keys) and self.keys[i] == key:
+                    del self.keys[i]
+
+    def suggest(self, prefix, columns, limit):
+        prefix = " ".join(text_tokens(prefix))
+        if not prefix:
+            return []
+        found = set()
+        for i in range(bisect_left(self.keys, (prefix,)), len(self.keys)):
+            key, column, value = self.keys[i]
+            if not key.startswith(prefix):
+                break
+            if column in columns:
+                found.add((column, value))
+        ranked = sorted(found, key=lambda cv: (-self.counts[cv], len(cv[1]), cv[1]))
+        return [(column, value, self.counts[(column, value)]) for column, value in ranked[:limit]]
+
+
+@dataclass
+class SnapshotPage:
+    ids: list
+    has_next: bool
+    facets: dict | None = None
+
+
+class JobSnapshot:
+    """
+    Per-process columnar copy of the fields the job board filters and sorts
+    on: parallel arrays indexed by row, dictionary-encoded facets, sorted
+    row orders kept up to date with bisect, and token-prefix indexes that
+    mirror the FTS match rules. Queries resolve to a page of ids here, so
+    the database only serves those rows.
+
+    Loaded on first use and kept current by replaying JobChangeLog; each
+    query first pulls any new log entries (a single indexed read). Database
+    reads happen outside the lock, which only guards the in-memory copy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # One full load at a time; queries keep using the old copy meanwhile
+        self._load_lock = threading.Lock()
+        self._built_at = None
+        self._checked_at = None
+        self._last_change = 0
+        self._reset()
+
+    def _reset(self):
+        self._rows = {}
+        self.ids = array("q")
+        self.salary = array("q")
+        self.date = array("q")
+        self.lat = array("d")
+        self.lng = array("d")
+        self.category = array("l")
+        self.location = array("l")
+        self.salary_range = array("l")
+        self.alive = bytearray()
+        self._dead = 0
+        self._codes = {facet: {} for facet in _FACET_COLUMNS}
+        self._labels = {facet: [] for facet in _FACET_COLUMNS}
+        # facet -> value code -> rows, for drill-down filters
+        self._facet_rows = {facet: defaultdict(set) for facet in _FACET_COLUMNS}
+        self._tokens = {column: _TokenIndex() for column in SEARCHABLE_COLUMNS}
+        self._suggestions = _SuggestionIndex()
+        self._row_values = {}
+        self._orders = {}
+
+    # -- maintenance -------------------------------------------------------
+
+    def _code(self, facet, value) -> int:
+        if value is None:
+            return -1
+        codes = self._codes[facet]
+        if value not in codes:
+            codes[value] = len(self._labels[facet])
+            self._labels[facet].append(value)
+        return codes[value]
+
+    def _put(self, job):
+        facets = dict(facet_values(job["category"], job["location"], job["salary"]))
+        values = {
+            "salary": _cents(job["salary"]),
+            "date": _micros(job["date"]),
+            "lat": math.nan if job["latitude"] is None else job["latitude"],
+            "lng": math.nan if job["longitude"] is None else job["longitude"],
+            **{column: self._code(facet, facets.get(facet)) for facet, column in _FACET_COLUMNS.items()},
+        }
+        row = self._rows.get(job["id"])
+        if row is None:
+            row = self._rows[job["id"]] = len(self.ids)
+            self.ids.append(job["id"])
+            self.alive.append(1)
+            for name, value in values.items():
+                getattr(self, name).append(value)
+        else:
+            self._unorder(row)
+            self._unfacet(row)
+            for name, value in values.items():
+                getattr(self, name)[row] = value
+        self._reorder(row)
+        for facet, column in _FACET_COLUMNS.items():
+            self._facet_rows[facet][getattr(self, column)[row]].add(row)
+        for column in SEARCHABLE_COLUMNS:
+            self._tokens[column].put(row, job[column])
+        self._set_suggestions(row, {
+            "title": " ".join((job["title"] or "").split()),
+            "category": facets.get(JobFacetCount.Facet.CATEGORY),
+            "location": facets.get(JobFacetCount.Facet.LOCATION),
+        })
+
+    def _set_suggestions(self, row, values):
+        for column, value in self._row_values.pop(row, {}).items():
+            self._suggestions.remove(column, value)
+        if values:
+            self._row_values[row] = values
+            for column, value in values.items():
+                self._suggestions.add(column, value)
+
+    def _drop(self, job_id):
+        row = self._rows.pop(job_id, None)
+        if row is None:
+            return
+        self._unorder(row)
+        self._unfacet(row)
+        self.alive[row] = 0
+        self._dead += 1
+        for index in self._tokens.values():
+            index.drop(row)
+        self._set_suggestions(row, None)
+
+    def _unfacet(self, row):
+        for facet, column in _FACET_COLUMNS.items():
+            self._facet_rows[facet][getattr(self, column)[row]].discard(row)
+
+    def _build(self, orderings=()):
+        self._reset()
+        # Read the watermark first so changes racing the load get replayed
+        self._last_change = JobChangeLog.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        self._suggestions.loading = True
+        for job in Job.objects.order_by("id").values(*_LOAD_FIELDS).iterator():
+            self._put(job)
+        self._suggestions.finish_loading()
+        for ordering in {_SALARY_ORDER, *orderings}:
+            self._order(ordering)
+        self._built_at = time.monotonic()
+
+    def _load(self, requested_at, wait=True) -> bool:
+        """
+        Build a fresh copy without holding the query lock and swap it in.
+        Returns False if another thread is already loading and `wait` is off.
+        """
+        if not self._load_lock.acquire(blocking=wait):
+            return False
+        try:
+            if self._built_at is not None and self._built_at >= requested_at:
+                return True  # another thread loaded while we waited
+            with self._lock:
+                orderings = tuple(self._orders)
+            fresh = JobSnapshot()
+            fresh._build(orderings)
+            with self._lock:
+                for name, value in vars(fresh).items():
+                    if name not in ("_lock", "_load_lock"):
+                        setattr(self, name, value)
+                self._checked_at = time.monotonic()
+            return True
+        finally:
+            self._load_lock.release()
+
+    def _read_changes(self, since):
+        """Log entries after `since` with their jobs' current rows; (None, None) past MAX_REPLAY."""
+        changes = list(
+            JobChangeLog.objects.filter(id__gt=since)
+            .order_by("id")
+            .values_list("id", "job_id")[: MAX_REPLAY + 1]
+        )
+        if len(changes) > MAX_REPLAY:
+            return None, None
+        job_ids = {job_id for _, job_id in changes}
+        current = {job["id"]: job for job in Job.objects.filter(pk__in=job_ids).values(*_LOAD_FIELDS)} if job_ids else {}
+        return changes, current
+
+    def _apply(self, changes, current):
+        # Another thread (or a fresh load) may already have applied some of these
+        changes = [(change_id, job_id) for change_id, job_id in changes if change_id > self._last_change]
+        if not changes:
+            return
+        for job_id in {job_id for _, job_id in changes}:
+            if job_id in current:
+                self._put(current[job_id])
+            else:
+                self._drop(job_id)
+        self._last_change = changes[-1][0]
+
+    def rebuild(self):
+        self._load(time.monotonic())
+        with self._lock:
+            self._checked_at = None
+
+    def _refresh(self, max_age=0):
+        now = time.monotonic()
+        with self._lock:
+            if max_age and self._checked_at is not None and now - self._checked_at < max_age:
+                return
+            never_built = self._built_at is None
+            # Deleted rows are tombstoned; reload once they make up half the arrays
+            stale = never_built or now - self._built_at > REBUILD_AFTER_SECONDS or self._dead > len(self.ids) // 2
+            since = self._last_change
+        # Only the first load makes queries wait; later ones replay meanwhile
+        if stale and self._load(now, wait=never_built):
+            return
+        changes, current = self._read_changes(since)
+        if changes is None:
+            self._load(now)
+            return
+        with self._lock:
+            self._apply(changes, current)
+            self._checked_at = now
+
+    # -- queries -----------------------------------------------------------
+
+    def _matching(self, min_salary, max_salary, term, columns, facet_filters=None):
+        """Rows passing the filters, or None when nothing filters (every live row)."""
+        allowed = None
+        for facet, value in (facet_filters or {}).items():
+            code = self._codes[facet].get(value)
+            rows = self._facet_rows[facet].get(code, set()) if code is not None else set()
+            allowed = set(rows) if allowed is None else allowed & rows
+        if min_salary is not None or max_salary is not None:
+            # A salary range is one contiguous slice of the salary order
+            keys, rows = self._order(_SALARY_ORDER)
+            lo = 0 if min_salary is None else bisect_left(keys, (_cents(min_salary),))
+            hi = len(keys) if max_salary is None else bisect_right(keys, (_cents(max_salary), math.inf))
+            salary_rows = set(rows[lo:hi])
+            allowed = salary_rows if allowed is None else allowed & salary_rows
+        if term is not None:
+            # Same rule as fts_match_expression: every word prefixes a token in one of the columns
+            groups = query_groups(term)
+            if not groups:
+                return set()
+            for group in groups:
+                hits = set().union(*(self._tokens[c].prefixed(w) for c in columns for w in group))
+                allowed = hits if allowed is None else allowed & hits
+        return allowed
+
+    def _column(self, name):
+        return self.ids if name == "id" else getattr(self, name)
+
+    def _key(self, ordering, row):
+        # Ascending tuple key for a row; descending columns are negated
+        return tuple(
+            -self._column(name[1:])[row] if name.startswith("-") else self._column(name)[row]
+            for name in ordering
+        )
+
+    def _order(self, ordering):
+        """Live rows sorted by the ordering, as parallel (keys, rows) lists."""
+        if ordering not in self._orders:
+            keyed = sorted((self._key(ordering, r), r) for r in self._rows.values())
+            self._orders[ordering] = ([k for k, _ in keyed], [r for _, r in keyed])
+        return self._orders[ordering]
+
+    def _unorder(self, row):
+        for ordering, (keys, rows) in self._orders.items():
+            i = bisect_left(keys, self._key(ordering, row))
+            while rows[i] != row:
+                i += 1
+            del keys[i], rows[i]
+
+    def _reorder(self, row):
+        for ordering, (keys, rows) in self._orders.items():
+            key = self._key(ordering, row)
+            i = bisect_right(keys, key)
+            keys.insert(i, key)
+            rows.insert(i, row)
+
+    def _units(self, name, value):
+        return {"date": _micros, "salary": _cents}.get(name, int)(value)
+
+    def _facet_counts(self, allowed, limit):
+        rows = self._rows.values() if allowed is None else allowed
+        counts = {}
+        for facet in JobFacetCount.Facet.values:
+            labels = self._labels[facet]
+            codes = Counter(map(getattr(self, _FACET_COLUMNS[facet]).__getitem__, rows))
+            counts[facet] = sorted(
+                ((labels[c], n) for c, n in codes.items() if c >= 0), key=lambda vc: (-vc[1], vc[0])
+            )[:limit]
+        return counts
+
+    def page(self, ordering, after=None, page_size=20, min_salary=None, max_salary=None,
+             term=None, columns=SEARCHABLE_COLUMNS, facets=False, facet_filters=None) -> SnapshotPage:
+        """
+        One keyset page of job ids. `ordering` uses paginate_keyset's
+        notation over date/salary/id and `after` is the decoded cursor;
+        `facet_filters` ({facet: value}) keeps jobs with those facet values.
+        """
+        self._refresh()
+        with self._lock:
+            keys, rows = self._order(ordering)
+            allowed = self._matching(min_salary, max_salary, term, columns, facet_filters)
+            start, after_key = 0, None
+            if after is not None:
+                signs = [-1 if name.startswith("-") else 1 for name in ordering]
+                names = [name.lstrip("-") for name in ordering]
+                after_key = tuple(s * self._units(n, v) for s, n, v in zip(signs, names, after))
+                start = bisect_right(keys, after_key)
+            if allowed is None:
+                picked = rows[start:start + page_size + 1]
+            elif len(allowed) ** 2 <= (page_size + 1) * (len(rows) - start):
+                # Few matches: walking the order would visit about
+                # len(rows) / len(allowed) rows per hit, so rank the matches directly
+                keyed = ((self._key(ordering, r), r) for r in allowed)
+                if after_key is not None:
+                    keyed = ((k, r) for k, r in keyed if k > after_key)
+                picked = [r for _, r in heapq.nsmallest(page_size + 1, keyed)]
+            else:
+                picked = []
+                for row in islice(rows, start, None):
+                    if row in allowed:
+                        picked.append(row)
+                        if len(picked) > page_size:
+                            break
+            return SnapshotPage(
+                ids=[self.ids[r] for r in picked[:page_size]],
+                has_next=len(picked) > page_size,
+                facets=self._facet_counts(allowed, FACET_LIMIT) if facets else None,
+            )
+
+    def ids_with_facets(self, facet_filters) -> list:
+        """Ids of the jobs having every {facet: value}, for filtering database queries."""
+        self._refresh()
+        with self._lock:
+            allowed = self._matching(None, None, None, SEARCHABLE_COLUMNS, facet_filters)
+            return [self.ids[r] for r in (allowed if allowed is not None else self._rows.values())]
+
+    def located_within(self, lat=None, lng=None, max_miles=math.inf) -> list:
+        """Ids of jobs with coordinates, limited to max_miles around (lat, lng) when given."""
+        self._refresh()
+        with self._lock:
+            ids = []
+            for row, job_id in enumerate(self.ids):
+                jlat, jlng = self.lat[row], self.lng[row]
+                if not self.alive[row] or math.isnan(jlat) or math.isnan(jlng):
+                    continue
+                if lat is not None and lng is not None and haversine_miles(lat, lng, jlat, jlng) > max_miles:
+                    continue
+                ids.append(job_id)
+            return ids
+
+    def suggest(self, prefix, columns=SEARCHABLE_COLUMNS, limit=8) -> list:
+        """
+        [(column, value, job count)] whose words start with `prefix`, most
+        common first. Served from memory; the change log is checked at most
+        every SUGGEST_MAX_AGE_SECONDS.
+        """
+        self._refresh(max_age=SUGGEST_MAX_AGE_SECONDS)
+        with self._lock:
+            return self._suggestions.suggest(prefix, set(columns), limit)
+
+
+def prune_change_log(older_than=CHANGE_LOG_RETENTION) -> int:
+    """
+    Delete JobChangeLog entries older than `older_than`, always keeping the
+    newest (it is the jobs generation). Snapshots only replay entries from
+    their last REBUILD_AFTER_SECONDS; older ones reload instead.
+    """
+    if older_than.total_seconds() <= REBUILD_AFTER_SECONDS:
+        raise ValueError(f"Keep at least {REBUILD_AFTER_SECONDS} seconds of change log")
+    latest = JobChangeLog.objects.order_by("-id").values_list("id", flat=True).first()
+    if latest is None:
+        return 0
+    deleted, _ = JobChangeLog.objects.filter(
+        id__lt=latest, changed_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
+
+
+job_snapshot = JobSnapshot()
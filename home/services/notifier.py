@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+
+from django.db import DatabaseError, connections
+
+from home.models import SavedSearchUnreadCounter
+
+# How often a process re-reads its subscribers' counters, to catch counts
+# changed by other processes (run_saved_searches, other workers)
+REFRESH_SECONDS = 25
+
+
+class UnreadNotifier:
+    """
+    In-process fan-out of unread-count changes to open event streams.
+    Each stream subscribes a queue on its event loop; publishers (usually
+    sync views running in worker threads) hand values over thread-safely,
+    so idle connections just wait and never touch the database. While
+    anyone is subscribed, one background thread per process re-reads all
+    their counters in a single query each tick and publishes the changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = defaultdict(set)
+        # owner -> last count handed to their streams
+        self._sent = {}
+        self._refresher = None
+
+    def subscribe(self, owner_id, count=None) -> asyncio.Queue:
+        """Listen for owner_id's counts; `count` is what the stream starts from."""
+        queue = asyncio.Queue()
+        with self._lock:
+            self._listeners[owner_id].add((asyncio.get_running_loop(), queue))
+            if count is not None:
+                self._sent[owner_id] = count
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_while_subscribed, daemon=True)
+                self._refresher.start()
+        return queue
+
+    def unsubscribe(self, owner_id, queue):
+        with self._lock:
+            listeners = self._listeners.get(owner_id, set())
+            listeners.difference_update({entry for entry in listeners if entry[1] is queue})
+            if not listeners:
+                self._listeners.pop(owner_id, None)
+                self._sent.pop(owner_id, None)
+
+    def has_listeners(self, owner_id) -> bool:
+        return owner_id in self._listeners
+
+    def publish(self, owner_id, count):
+        with self._lock:
+            listeners = list(self._listeners.get(owner_id, ()))
+            if listeners:
+                self._sent[owner_id] = count
+        for loop, queue in listeners:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, count)
+            except RuntimeError:
+                # loop already closed; the stream's finally block will unsubscribe
+                pass
+
+    def refresh(self):
+        """Re-read every subscribed owner's counter in one query; publish the ones that changed."""
+        with self._lock:
+            owner_ids = list(self._listeners)
+        if not owner_ids:
+            return
+        counts = dict(
+            SavedSearchUnreadCounter.objects.filter(pk__in=owner_ids).values_list("owner_id", "unread_count")
+        )
+        for owner_id in owner_ids:
+            count = counts.get(owner_id, 0)
+            if self._sent.get(owner_id) != count:
+                self.publish(owner_id, count)
+
+    def _refresh_while_subscribed(self):
+        while True:
+            time.sleep(REFRESH_SECONDS)
+            with self._lock:
+                if not self._listeners:
+                    self._refresher = None
+                    return
+            try:
+                self.refresh()
+            except DatabaseError:
+                pass  # try again next tick
+            finally:
+                connections.close_all()
+
+
+notifier = UnreadNotifier()
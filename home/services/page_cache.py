@@ -0,0 +1,71 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from home.models import JobChangeLog
+
+
+def jobs_generation() -> str:
+    """
+    A token that changes whenever any job is saved or deleted: the newest
+    JobChangeLog entry. It lives in the database, so every process agrees
+    on it; the timestamp guards against SQLite reusing a rolled-back id.
+    """
+    latest = JobChangeLog.objects.order_by("-id").values_list("id", "changed_at").first()
+    return f"{latest[0]}-{latest[1].timestamp()}" if latest else "0"
+
+
+def _page_key(request, params, generation) -> str:
+    # Only the parameters the view reads, blanks dropped, in a fixed order,
+    # so "?sort=newest&search=" and "?sort=newest" share an entry. Values are
+    # escaped: "search=python%26sort%3D..." must not read as two parameters.
+    normalized = urlencode([(name, value) for name in params if (value := request.GET.get(name, ""))])
+    digest = hashlib.sha1(normalized.encode()).hexdigest()
+    return f"job-page:{request.path}:{generation}:{digest}"
+
+
+def job_page_etag(request, params) -> str:
+    """
+    Strong ETag for a job listing response: the same query at the same jobs
+    generation. It hashes the escaped cache key, so two listings only share
+    a tag when they share every parameter value.
+    """
+    return '"%s"' % hashlib.sha1(_page_key(request, params, jobs_generation()).encode()).hexdigest()
+
+
+def cache_anonymous_job_page(params):
+    """
+    Serve anonymous GETs of a job listing view from the cache. The key
+    includes jobs_generation(), so any job write makes old entries
+    unreachable; they simply age out.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            timeout = getattr(settings, "JOB_PAGE_CACHE_SECONDS", 0)
+            if (
+                not timeout
+                or request.method != "GET"
+                or request.user.is_authenticated
+                # flash messages are per visitor
+                or len(get_messages(request))
+            ):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request, params, jobs_generation())
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, (response.content, response["Content-Type"]), timeout)
+            return response
+        return wrapper
+    return decorator
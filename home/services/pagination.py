@@ -0,0 +1,97 @@
+import base64
+import json
+from dataclasses import dataclass, field
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+@dataclass
+class KeysetPage:
+    items: list = field(default_factory=list)
+    next_cursor: str | None = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def page_size_from(request, default=DEFAULT_PAGE_SIZE):
+    try:
+        size = int(request.GET.get("page_size", default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _split(ordering):
+    return [(o.lstrip("-"), o.startswith("-")) for o in ordering]
+
+
+def encode_cursor(obj, ordering) -> str:
+    values = []
+    for name, _ in _split(ordering):
+        value = getattr(obj, name) if not isinstance(obj, dict) else obj[name]
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        elif value is not None and not isinstance(value, (bool, int, float, str)):
+            value = str(value)
+        values.append(value)
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, model, ordering):
+    """Turn an opaque cursor back into typed values, or None if it's garbage."""
+    values = load_cursor(cursor)
+    try:
+        fields = [model._meta.get_field(name) for name, _ in _split(ordering)]
+        if values is None or len(values) != len(fields):
+            return None
+        return [f.to_python(v) for f, v in zip(fields, values)]
+    except Exception:
+        return None
+
+
+def load_cursor(cursor):
+    """The raw JSON list inside a cursor, for keys that aren't model fields."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _after(ordering, values) -> Q:
+    # Lexicographic "comes after" for a mixed asc/desc ordering:
+    # (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+    keys = _split(ordering)
+    q = Q()
+    for i, (name, desc) in enumerate(keys):
+        step = Q(**{f"{name}__{'lt' if desc else 'gt'}": values[i]})
+        for j in range(i):
+            step &= Q(**{keys[j][0]: values[j]})
+        q |= step
+    return q
+
+
+def paginate_keyset(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE) -> KeysetPage:
+    """
+    Seek-based pagination: the cursor carries the last row's sort key, so
+    every page is an index range scan no matter how deep the user scrolls.
+    `ordering` must end in a unique column (usually id) to break ties.
+    """
+    values = decode_cursor(cursor, queryset.model, ordering)
+    qs = queryset.order_by(*ordering)
+    if values is not None:
+        qs = qs.filter(_after(ordering, values))
+    rows = list(qs[: page_size + 1])
+    page = KeysetPage(items=rows[:page_size])
+    if len(rows) > page_size:
+        page.next_cursor = encode_cursor(rows[page_size - 1], ordering)
+    return page
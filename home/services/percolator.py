@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import defaultdict
+
+from home.models import SavedCandidateSearch
+from home.services.fulltext import fold, text_tokens
+
+# Other processes may create or pause searches; rebuild at most this often
+# so their changes show up without a query per lookup.
+REBUILD_AFTER_SECONDS = 300
+
+
+def _trigrams(text) -> set:
+    text = fold(text)
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _anchor(text):
+    """
+    One trigram every matching profile must contain. Whether a term matches
+    as a substring or as full-text word prefixes, each of its words appears
+    in the (folded) profile text, so all of their trigrams do too; we key the
+    search on the first trigram of its longest word.
+    """
+    words = text_tokens(text)
+    if not words:
+        return None
+    longest = max(words, key=len)
+    return longest[:3] if len(longest) >= 3 else None
+
+
+class SearchPercolator:
+    """
+    Inverted index from keyword/location trigrams to active saved searches.
+    A changed profile looks up only the searches its own trigrams could
+    satisfy; callers still verify each candidate exactly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built_at = None
+        self._searches = {}
+        self._keys = {}
+        self._by_keyword = defaultdict(set)
+        self._by_location = defaultdict(set)
+        self._unanchored = set()
+
+    def rebuild(self):
+        active = SavedCandidateSearch.objects.filter(is_active=True).only(
+            "id", "owner_id", "keywords", "fuzzy", "location", "min_years_experience"
+        )
+        with self._lock:
+            self._searches.clear()
+            self._keys.clear()
+            self._by_keyword.clear()
+            self._by_location.clear()
+            self._unanchored.clear()
+            for s in active:
+                self._add(s)
+            self._built_at = time.monotonic()
+
+    def _ensure_built(self):
+        if self._built_at is None or time.monotonic() - self._built_at > REBUILD_AFTER_SECONDS:
+            self.rebuild()
+
+    def _add(self, s):
+        self._searches[s.id] = s
+        # a misspelled profile word needn't contain the keyword's trigrams
+        if not s.fuzzy and (key := _anchor(s.keywords)):
+            bucket = self._by_keyword
+        elif key := _anchor(s.location):
+            bucket = self._by_location
+        else:
+            self._unanchored.add(s.id)
+            return
+        bucket[key].add(s.id)
+        self._keys[s.id] = (bucket, key)
+
+    def _discard(self, search_id):
+        if self._searches.pop(search_id, None) is None:
+            return
+        self._unanchored.discard(search_id)
+        if search_id in self._keys:
+            bucket, key = self._keys.pop(search_id)
+            bucket[key].discard(search_id)
+            if not bucket[key]:
+                del bucket[key]
+
+    def update(self, s: SavedCandidateSearch):
+        """Keep the index current after a search is created, edited or toggled."""
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._discard(s.id)
+            if s.is_active:
+                self._add(s)
+
+    def remove(self, search_id):
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._discard(search_id)
+
+    def candidates_for(self, prof) -> list:
+        """Active searches the profile could satisfy, ahead of exact verification."""
+        self._ensure_built()
+        text = " ".join(
+            f or "" for f in (prof.headline, prof.skills, prof.projects, prof.experience, prof.education)
+        )
+        with self._lock:
+            ids = set(self._unanchored)
+            for tri in _trigrams(text) & self._by_keyword.keys():
+                ids |= self._by_keyword[tri]
+            for tri in _trigrams(prof.location) & self._by_location.keys():
+                ids |= self._by_location[tri]
+            return [self._searches[i] for i in ids]
+
+
+percolator = SearchPercolator()
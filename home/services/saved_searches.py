@@ -1,43 +1,288 @@
-from django.db.models import Q
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from accounts.models import Profile
 from django.contrib.auth.models import User
-from home.models import SavedCandidateSearch, SavedCandidateMatch
+from home.models import SavedCandidateSearch, SavedCandidateMatch, SavedSearchUnreadCounter, SearchTrigram
+from home.services.candidate_search import filter_profiles_by_keywords, profile_matches_keywords
+from home.services.fuzzy import fuzzy_groups
+from home.services.notifier import notifier
+from home.services.percolator import percolator
 
 def _profile_queryset_for_search(s: SavedCandidateSearch):
-    base = Profile.objects.select_related("user").filter(
+    base = Profile.objects.filter(
         user__is_active=True,
         is_recruiter=False,
     ).exclude(visibility="PRIVATE")
     q = Q()
 
     if s.keywords:
-        kw = s.keywords.strip()
-        q &= (
-            Q(headline__icontains=kw) |
-            Q(skills__icontains=kw) |
-            Q(projects__icontains=kw) |
-            Q(experience__icontains=kw) |
-            Q(education__icontains=kw)
-        )
+        # full-text index on SQLite, icontains across the same fields elsewhere
+        base = filter_profiles_by_keywords(base, keyword_query(s))
 
     if s.location:
         q &= Q(location__icontains=s.location)
 
     if s.min_years_experience:
-        q &= Q(experience__icontains=f"{s.min_years_experience}+")
+        q &= Q(years_experience__gte=s.min_years_experience)
 
     return base.filter(q)
 
-def run_search_and_record_new_matches(s: SavedCandidateSearch) -> int:
-    qs = _profile_queryset_for_search(s)
-    count_new = 0
-    for prof in qs:
-        if prof.user_id == s.owner_id:
+def keyword_query(s: SavedCandidateSearch):
+    """The search's keywords, expanded with close spellings when it is fuzzy."""
+    if s.fuzzy:
+        return fuzzy_groups(s.keywords, [SearchTrigram.Source.PROFILE_SKILLS])
+    return s.keywords.strip()
+
+def _contains(value, needle: str) -> bool:
+    return needle.lower() in (value or "").lower()
+
+def profile_matches_search(prof: Profile, s: SavedCandidateSearch, keywords=None) -> bool:
+    """
+    In-memory twin of _profile_queryset_for_search for a single profile.
+    Pass keyword_query(s) as `keywords` when checking many profiles.
+    """
+    if prof.is_recruiter or prof.visibility == Profile.Visibility.PRIVATE:
+        return False
+    if not prof.user.is_active or prof.user_id == s.owner_id:
+        return False
+
+    if s.keywords and not profile_matches_keywords(prof, keywords or keyword_query(s)):
+        return False
+
+    if s.location and not _contains(prof.location, s.location):
+        return False
+
+    if s.min_years_experience and prof.years_experience < s.min_years_experience:
+        return False
+
+    return True
+
+BULK_BATCH_SIZE = 500
+
+def _publish_unread_counts(owner_ids):
+    # Push fresh counts to any open badge streams once the change is committed
+    owner_ids = [o for o in owner_ids if notifier.has_listeners(o)]
+    if not owner_ids:
+        return
+
+    def send():
+        counts = dict(
+            SavedSearchUnreadCounter.objects.filter(pk__in=owner_ids).values_list("owner_id", "unread_count")
+        )
+        for owner_id in owner_ids:
+            notifier.publish(owner_id, counts.get(owner_id, 0))
+
+    transaction.on_commit(send)
+
+def adjust_unread_counts(deltas: dict):
+    """Apply {owner_id: +/-n} to the recruiters' unread counters atomically."""
+    for owner_id, delta in deltas.items():
+        if not delta:
             continue
-        obj, created = SavedCandidateMatch.objects.get_or_create(search=s, candidate=prof.user)
-        if created:
-            count_new += 1
-    s.last_run_at = timezone.now()
-    s.save(update_fields=["last_run_at"])
-    return count_new
+        updated = SavedSearchUnreadCounter.objects.filter(pk=owner_id).update(
+            unread_count=Greatest(F("unread_count") + delta, 0)
+        )
+        if not updated and delta > 0:
+            _, created = SavedSearchUnreadCounter.objects.get_or_create(
+                pk=owner_id, defaults={"unread_count": delta}
+            )
+            if not created:
+                SavedSearchUnreadCounter.objects.filter(pk=owner_id).update(unread_count=F("unread_count") + delta)
+    # After the writes: outside a transaction on_commit runs the push immediately
+    _publish_unread_counts([o for o, d in deltas.items() if d])
+
+def unread_count_for(owner_id) -> int:
+    return (
+        SavedSearchUnreadCounter.objects.filter(pk=owner_id)
+        .values_list("unread_count", flat=True)
+        .first()
+    ) or 0
+
+def mark_all_seen(owner_id):
+    with transaction.atomic():
+        SavedCandidateMatch.objects.filter(search__owner_id=owner_id, seen=False).update(seen=True)
+        SavedSearchUnreadCounter.objects.filter(pk=owner_id).update(unread_count=0)
+        _publish_unread_counts([owner_id])
+
+def _lock_searches(search_ids):
+    # Serialize writers recording matches for the same searches, so the
+    # re-reads below see every committed row. SQLite already allows only
+    # one writer at a time.
+    if connection.features.has_select_for_update:
+        list(SavedCandidateSearch.objects.select_for_update().filter(pk__in=search_ids).values_list("pk", flat=True))
+
+def _insert_matches(pairs) -> list:
+    """
+    Insert the (search_id, candidate_id) pairs that aren't recorded yet and
+    return the ones that were, so counters move by rows actually written.
+    Call inside atomic() after _lock_searches.
+    """
+    pairs, inserted = list(pairs), []
+    for i in range(0, len(pairs), BULK_BATCH_SIZE):
+        batch = pairs[i:i + BULK_BATCH_SIZE]
+        present = set(
+            SavedCandidateMatch.objects
+            .filter(search_id__in={sid for sid, _ in batch}, candidate_id__in={uid for _, uid in batch})
+            .order_by()
+            .values_list("search_id", "candidate_id")
+        )
+        fresh = [pair for pair in batch if pair not in present]
+        SavedCandidateMatch.objects.bulk_create(
+            [SavedCandidateMatch(search_id=sid, candidate_id=uid) for sid, uid in fresh],
+            ignore_conflicts=True,
+        )
+        inserted += fresh
+    return inserted
+
+def _retract_matches(matches) -> Counter:
+    """Delete a SavedCandidateMatch queryset; returns {owner_id: unseen matches removed}."""
+    unseen = Counter(matches.filter(seen=False).order_by().values_list("search__owner_id", flat=True))
+    matches.delete()
+    return unseen
+
+@dataclass
+class SearchRun:
+    search: SavedCandidateSearch
+    started: datetime
+    new_ids: set = field(default_factory=set)
+    stale_ids: set = field(default_factory=set)
+
+def find_new_matches(s: SavedCandidateSearch, full: bool = False) -> SearchRun:
+    """
+    Read side of a saved-search run: candidate ids that match but aren't
+    recorded yet, and recorded ones that no longer qualify. After the first
+    run only profiles modified since the last_run_at watermark are
+    considered, so polling runs cost proportional to recent churn; pass
+    full=True to rescan everything. Safe to call from worker threads since
+    it never writes.
+    """
+    started = timezone.now()
+    qs = _profile_queryset_for_search(s).exclude(user_id=s.owner_id)
+    existing = SavedCandidateMatch.objects.filter(search=s)
+    delta = not full and s.last_run_at is not None
+    if delta:
+        changed = Profile.objects.filter(updated_at__gte=s.last_run_at).values_list("user_id", flat=True)
+        qs = qs.filter(updated_at__gte=s.last_run_at)
+        existing = existing.filter(candidate_id__in=changed)
+
+    matching = set(qs.values_list("user_id", flat=True))
+    recorded = set(existing.order_by().values_list("candidate_id", flat=True))
+    return SearchRun(
+        search=s,
+        started=started,
+        new_ids=matching - recorded,
+        stale_ids=recorded - matching,
+    )
+
+def record_search_run(run: SearchRun) -> int:
+    """
+    Write side of a saved-search run: insert new matches, retract stale ones
+    in a single delete, and move the watermark. The unread counter moves by
+    the rows actually inserted and deleted, not by what the read side saw.
+    """
+    s = run.search
+    with transaction.atomic():
+        _lock_searches([s.pk])
+        inserted = _insert_matches((s.pk, uid) for uid in run.new_ids)
+        removed = Counter()
+        if run.stale_ids:
+            removed = _retract_matches(SavedCandidateMatch.objects.filter(search=s, candidate_id__in=run.stale_ids))
+        adjust_unread_counts({s.owner_id: len(inserted) - removed[s.owner_id]})
+        # Watermark from before the read so edits made mid-run are picked up next time
+        s.last_run_at = run.started
+        s.save(update_fields=["last_run_at"])
+    return len(inserted)
+
+def run_search_and_record_new_matches(s: SavedCandidateSearch, full: bool = False) -> int:
+    return record_search_run(find_new_matches(s, full=full))
+
+def record_profiles_against_searches(profile_ids) -> int:
+    """
+    Re-evaluate a batch of changed profiles in one pass and record or retract
+    only those candidates' SavedCandidateMatch rows. Each profile is tested
+    against the searches the percolator says it could satisfy; existing
+    matches on any other active search no longer hold and are retracted.
+    """
+    profiles = list(Profile.objects.select_related("user").filter(pk__in=profile_ids))
+    if not profiles:
+        return 0
+
+    owners = {}
+    matched = set()
+    keywords = {}
+    for prof in profiles:
+        for s in percolator.candidates_for(prof):
+            if s.id not in keywords:
+                keywords[s.id] = keyword_query(s)
+            if profile_matches_search(prof, s, keywords[s.id]):
+                matched.add((s.id, prof.user_id))
+                owners[s.id] = s.owner_id
+    if matched:
+        # Searches come from a cached index; drop any deleted or paused since
+        live = set(
+            SavedCandidateSearch.objects
+            .filter(id__in={sid for sid, _ in matched}, is_active=True)
+            .values_list("id", flat=True)
+        )
+        matched = {pair for pair in matched if pair[0] in live}
+
+    existing = {}
+    for pk, sid, uid, owner_id in (
+        SavedCandidateMatch.objects
+        .filter(candidate_id__in=[p.user_id for p in profiles], search__is_active=True)
+        .order_by()
+        .values_list("id", "search_id", "candidate_id", "search__owner_id")
+    ):
+        existing[(sid, uid)] = pk
+        owners[sid] = owner_id
+
+    # The percolator's search list can lag other processes, so a recorded
+    # match it didn't offer is re-checked against the search as stored now
+    unoffered = existing.keys() - matched
+    if unoffered:
+        current = SavedCandidateSearch.objects.in_bulk({sid for sid, _ in unoffered})
+        by_user = {p.user_id: p for p in profiles}
+        matched |= {
+            (sid, uid) for sid, uid in unoffered
+            if sid in current and current[sid].is_active
+            and profile_matches_search(by_user[uid], current[sid])
+        }
+    stale = [pk for pair, pk in existing.items() if pair not in matched]
+
+    with transaction.atomic():
+        _lock_searches({sid for sid, _ in matched} | {sid for sid, _ in existing})
+        inserted = _insert_matches(matched - existing.keys())
+        deltas = Counter(owners[sid] for sid, _ in inserted)
+        if stale:
+            deltas.subtract(_retract_matches(SavedCandidateMatch.objects.filter(pk__in=stale)))
+        adjust_unread_counts(deltas)
+    return len(inserted)
+
+
+# Coalescing queue: profile saves inside one transaction are collected and
+# evaluated together once it commits, so a burst of N saves (e.g. a seed
+# command) becomes a single batched pass instead of N inline ones.
+_queue = threading.local()
+
+def _pending() -> set:
+    if not hasattr(_queue, "ids"):
+        _queue.ids = set()
+    return _queue.ids
+
+def flush_profile_reindex_queue():
+    ids, _queue.ids = _pending(), set()
+    if ids:
+        record_profiles_against_searches(ids)
+
+def enqueue_profile_reindex(profile_id):
+    _pending().add(profile_id)
+    # Every save registers a flush; the first one to run drains the whole
+    # set and the rest are no-ops. Runs immediately outside a transaction.
+    transaction.on_commit(flush_profile_reindex_queue)
@@ -1,13 +1,64 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from accounts.models import Profile
-from home.models import SavedCandidateSearch
-from home.services.saved_searches import run_search_and_record_new_matches
+from home.models import Job, JobChangeLog, SavedCandidateSearch
+from home.services.facets import adjust_facet_counts, facet_values, job_facet_values
+from home.services.fuzzy import Source, index_terms
+from home.services.percolator import percolator
+from home.services.saved_searches import enqueue_profile_reindex
+
+# Registered before the reindex receiver so fuzzy saved searches see new words
+@receiver(post_save, sender=Profile)
+def index_profile_skill_terms(sender, instance: Profile, **kwargs):
+    index_terms(Source.PROFILE_SKILLS, instance.skills)
 
 @receiver(post_save, sender=Profile)
 def reindex_saved_searches_on_profile_change(sender, instance: Profile, **kwargs):
-    if instance.is_recruiter:
+    if not getattr(settings, "SAVED_SEARCH_REINDEX_ON_PROFILE_SAVE", True):
         return
-    active = SavedCandidateSearch.objects.select_related("owner").filter(is_active=True)
-    for s in active:
-        run_search_and_record_new_matches(s)
\ No newline at end of file
+    # Only this profile changed; queue it so saves in the same transaction
+    # are evaluated together against the percolator once it commits.
+    # Recruiter profiles are queued too so any stale matches get retracted.
+    enqueue_profile_reindex(instance.pk)
+
+@receiver(post_save, sender=SavedCandidateSearch)
+def update_percolator_on_search_change(sender, instance: SavedCandidateSearch, **kwargs):
+    percolator.update(instance)
+
+@receiver(post_delete, sender=SavedCandidateSearch)
+def update_percolator_on_search_delete(sender, instance: SavedCandidateSearch, **kwargs):
+    percolator.remove(instance.id)
+
+FACET_FIELDS = {"category", "location", "salary"}
+
+@receiver(pre_save, sender=Job)
+def remember_job_facets(sender, instance: Job, update_fields=None, **kwargs):
+    # Old facet values come from the stored row; the in-memory instance may already be edited
+    instance._old_facet_values = None
+    if instance.pk is None or (update_fields is not None and not FACET_FIELDS & set(update_fields)):
+        return
+    row = Job.objects.filter(pk=instance.pk).values_list("category", "location", "salary").first()
+    instance._old_facet_values = facet_values(*row) if row else []
+
+@receiver(post_save, sender=Job)
+def update_facet_counts_on_job_save(sender, instance: Job, created, **kwargs):
+    old = getattr(instance, "_old_facet_values", None)
+    if created:
+        adjust_facet_counts(added=job_facet_values(instance))
+    elif old is not None:
+        adjust_facet_counts(removed=old, added=job_facet_values(instance))
+
+@receiver(post_delete, sender=Job)
+def update_facet_counts_on_job_delete(sender, instance: Job, **kwargs):
+    adjust_facet_counts(removed=job_facet_values(instance))
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def log_job_change(sender, instance: Job, **kwargs):
+    JobChangeLog.objects.create(job_id=instance.pk)
+
+@receiver(post_save, sender=Job)
+def index_job_terms(sender, instance: Job, **kwargs):
+    index_terms(Source.JOB_TITLE, instance.title)
+    index_terms(Source.JOB_CATEGORY, instance.category)
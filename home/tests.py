@@ -1,8 +1,37 @@
+import re
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile, recruiter_fields_mask
+from messaging.models import Conversation, Message
 
-from .models import Job, Application
+from .models import (
+    Job, Application, GeocodeCache, JobChangeLog, JobFacetCount, JobRecommendation, SavedCandidateSearch, SavedCandidateMatch,
+    SavedSearchUnreadCounter, SearchTrigram,
+)
+from .services.candidate_search import PROFILE_FTS_INDEXED_COLUMNS, PROFILE_FTS_TABLE
+from .services.fulltext import _fts_schema
+from .services.fuzzy import similar_terms
+from .services.geocoding import geocode_location, geocode_lru
+from .services.job_search import JOB_FTS_COLUMNS, JOB_FTS_TABLE, paginate_ranked_jobs, search_jobs
+from .services.job_snapshot import job_snapshot
+from .services.notifier import notifier
+from .services.page_cache import _page_key
+from .services.percolator import percolator
+from .services.saved_searches import (
+    adjust_unread_counts, find_new_matches, record_search_run, run_search_and_record_new_matches,
+)
+from .views import JOB_PAGE_PARAMS
 
 
 class ApplyFlowTests(TestCase):
@@ -49,3 +78,907 @@ class ApplyFlowTests(TestCase):
         self.client.login(username="owner", password="pw")
         resp = self.client.get(reverse("home.show", args=[self.job.id]))
         self.assertContains(resp, "Applications (1)")
+
+
+class RecommendationPaginationTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username="owner", password="pw")
+        self.seeker = User.objects.create_user(username="seeker", password="pw")
+        for i in range(25):
+            job = Job.objects.create(user=self.owner, title=f"Job {i}")
+            JobRecommendation.objects.create(candidate=self.seeker, job=job, match_score=50 + (i % 3))
+
+    def test_cursor_walks_every_recommendation_once(self):
+        self.client.login(username="seeker", password="pw")
+        url = reverse("home.job_recs_api")
+        first = self.client.get(url, {"min_score": 0}).json()
+        self.assertEqual(len(first["results"]), 20)
+        self.assertIsNotNone(first["next_cursor"])
+
+        second = self.client.get(url, {"min_score": 0, "cursor": first["next_cursor"]}).json()
+        self.assertEqual(len(second["results"]), 5)
+        self.assertIsNone(second["next_cursor"])
+
+        ids = [r["id"] for r in first["results"] + second["results"]]
+        self.assertEqual(len(set(ids)), 25)
+        scores = [r["match_score"] for r in first["results"] + second["results"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_garbage_cursor_starts_from_the_top(self):
+        self.client.login(username="seeker", password="pw")
+        resp = self.client.get(reverse("home.job_recs"), {"cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.context["recommendations"]), 20)
+
+
+class SavedSearchProfileSignalTests(TestCase):
+    def setUp(self):
+        percolator.rebuild()
+        self.recruiter = User.objects.create_user(username="rec", password="pw")
+        self.recruiter.profile.is_recruiter = True
+        self.recruiter.profile.save()
+        self.search = SavedCandidateSearch.objects.create(
+            owner=self.recruiter, name="Django devs", keywords="django", location="Atlanta"
+        )
+        self.candidate = User.objects.create_user(username="cand", password="pw")
+
+    def _save_profile(self, **fields):
+        profile = self.candidate.profile
+        for key, value in fields.items():
+            setattr(profile, key, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+
+    def test_matching_profile_save_records_a_match(self):
+        self._save_profile(skills="Python, Django", location="Atlanta, GA")
+        self.assertTrue(SavedCandidateMatch.objects.filter(search=self.search, candidate=self.candidate).exists())
+
+    def test_profile_that_stops_matching_is_retracted(self):
+        self._save_profile(skills="Python, Django", location="Atlanta, GA")
+        self._save_profile(visibility=Profile.Visibility.PRIVATE)
+        self.assertFalse(SavedCandidateMatch.objects.filter(candidate=self.candidate).exists())
+
+    def test_match_on_a_search_the_percolator_has_not_seen_is_kept(self):
+        self._save_profile(skills="Python, Django", location="Atlanta, GA")
+        # Another process whose percolator was built before the search existed
+        percolator.remove(self.search.id)
+        self._save_profile(headline="Backend developer")
+        self.assertTrue(SavedCandidateMatch.objects.filter(search=self.search, candidate=self.candidate).exists())
+        self.assertEqual(SavedSearchUnreadCounter.objects.get(pk=self.recruiter.id).unread_count, 1)
+
+    def test_burst_of_profile_saves_is_evaluated_once_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for i in range(5):
+                user = User.objects.create_user(username=f"burst{i}", password="pw")
+                user.profile.skills = "django"
+                user.profile.location = "Atlanta"
+                user.profile.save()
+            self.assertFalse(SavedCandidateMatch.objects.exists())
+        self.assertEqual(self.search.matches.count(), 5)
+        # the first flush drained the queue; the rest found nothing to do
+        self.assertGreater(len(callbacks), 1)
+
+    def test_full_run_records_only_new_matches(self):
+        for i in range(3):
+            user = User.objects.create_user(username=f"dev{i}", password="pw")
+            user.profile.skills = "django"
+            user.profile.location = "Atlanta"
+            user.profile.save()
+        SavedCandidateMatch.objects.all().delete()
+        SavedSearchUnreadCounter.objects.create(owner=self.recruiter)
+
+        # profile ids, existing ids, then in a savepoint: recorded pairs, one insert, counter bump, watermark
+        with self.assertNumQueries(8):
+            self.assertEqual(run_search_and_record_new_matches(self.search), 3)
+        self.assertEqual(run_search_and_record_new_matches(self.search), 0)
+        self.assertEqual(self.search.matches.count(), 3)
+
+    def test_counter_moves_by_rows_actually_written(self):
+        self._save_profile(skills="django", location="Atlanta")
+        SavedCandidateMatch.objects.all().delete()
+        SavedSearchUnreadCounter.objects.filter(pk=self.recruiter.id).update(unread_count=0)
+
+        run = find_new_matches(self.search, full=True)
+        # Another process records the same match between the read and the write
+        SavedCandidateMatch.objects.create(search=self.search, candidate=self.candidate)
+        adjust_unread_counts({self.recruiter.id: 1})
+        self.assertEqual(record_search_run(run), 0)
+        self.assertEqual(SavedSearchUnreadCounter.objects.get(pk=self.recruiter.id).unread_count, 1)
+
+        # ...and retracts it before this run gets to
+        other = User.objects.create_user(username="other", password="pw")
+        Profile.objects.filter(user=other).update(skills="django", location="Atlanta")
+        SavedCandidateMatch.objects.create(search=self.search, candidate=other)
+        adjust_unread_counts({self.recruiter.id: 1})
+        Profile.objects.filter(user=self.candidate).update(skills="cobol", updated_at=timezone.now())
+        run = find_new_matches(self.search, full=True)
+        self.search.matches.filter(candidate=self.candidate).delete()
+        adjust_unread_counts({self.recruiter.id: -1})
+        record_search_run(run)
+        self.assertEqual(SavedSearchUnreadCounter.objects.get(pk=self.recruiter.id).unread_count, 1)
+
+    def test_delta_run_only_reads_profiles_changed_since_watermark(self):
+        run_search_and_record_new_matches(self.search)
+        late = User.objects.create_user(username="late", password="pw")
+        late.profile.skills = "django"
+        late.profile.location = "Atlanta"
+        late.profile.save()
+        SavedCandidateMatch.objects.all().delete()
+
+        # The delta run only sees the profile touched after the watermark
+        self.assertEqual(run_search_and_record_new_matches(self.search), 1)
+        self.assertEqual(run_search_and_record_new_matches(self.search, full=True), 0)
+
+    def test_delta_run_sees_profiles_saved_with_update_fields(self):
+        self.search.min_years_experience = 4
+        self.search.save()
+        self._save_profile(skills="django", location="Atlanta", experience="2 years")
+        run_search_and_record_new_matches(self.search)
+        self.assertFalse(self.search.matches.exists())
+
+        # The save's on_commit re-evaluation doesn't run here, so only the delta run can pick it up
+        profile = Profile.objects.get(user=self.candidate)
+        profile.experience = "6 years of Django"
+        profile.save(update_fields=["experience"])
+        self.assertEqual(run_search_and_record_new_matches(self.search), 1)
+
+    def test_unread_counter_tracks_matches_and_revalidates(self):
+        self._save_profile(skills="django", location="Atlanta")
+        self.client.login(username="rec", password="pw")
+        url = reverse("saved_search_unread_count")
+
+        resp = self.client.get(url)
+        self.assertEqual(resp.json(), {"count": 1})
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp.status_code, 304)
+
+        self._save_profile(visibility=Profile.Visibility.PRIVATE)
+        self.assertEqual(self.client.get(url).json(), {"count": 0})
+
+        self._save_profile(visibility=Profile.Visibility.PUBLIC)
+        self.client.get(reverse("saved_search_mark_seen"))
+        self.assertEqual(self.client.get(url).json(), {"count": 0})
+        self.assertFalse(SavedCandidateMatch.objects.filter(seen=False).exists())
+
+    def test_runs_retract_matches_that_no_longer_qualify(self):
+        run_search_and_record_new_matches(self.search)
+        SavedCandidateMatch.objects.create(search=self.search, candidate=self.candidate)
+        # edited without signals, as a bulk import would
+        Profile.objects.filter(user=self.candidate).update(skills="cobol", updated_at=timezone.now())
+
+        run_search_and_record_new_matches(self.search)
+        self.assertFalse(self.search.matches.exists())
+
+        SavedCandidateMatch.objects.create(search=self.search, candidate=self.candidate)
+        run_search_and_record_new_matches(self.search, full=True)
+        self.assertFalse(self.search.matches.exists())
+
+    def test_min_years_experience_uses_parsed_years(self):
+        self.search.min_years_experience = 4
+        self.search.save()
+        self._save_profile(skills="django", location="Atlanta", experience="3 years of Django")
+        self.assertFalse(self.search.matches.exists())
+        self._save_profile(experience="Senior dev, 5+ yrs building APIs")
+        self.assertEqual(self.candidate.profile.years_experience, 5)
+        self.assertTrue(self.search.matches.exists())
+
+        Profile.objects.filter(user=self.candidate).update(years_experience=0)
+        call_command("backfill_years_experience", stdout=StringIO())
+        self.assertEqual(Profile.objects.get(user=self.candidate).years_experience, 5)
+
+    def test_keywords_match_word_prefixes_in_any_order(self):
+        self.search.keywords = "djang backend"
+        self.search.save()
+        self._save_profile(headline="Backend engineer", skills="Djangó, Postgres", location="Atlanta")
+        self.assertTrue(self.search.matches.exists())
+
+        # the batch run goes through the full-text index and must agree
+        self.search.matches.all().delete()
+        self.assertEqual(run_search_and_record_new_matches(self.search, full=True), 1)
+
+        self._save_profile(skills="Flask")
+        self.assertFalse(self.search.matches.exists())
+        self.assertEqual(run_search_and_record_new_matches(self.search, full=True), 0)
+
+    def test_run_saved_searches_command_runs_only_due_searches(self):
+        user = User.objects.create_user(username="dev", password="pw")
+        user.profile.skills = "django"
+        user.profile.location = "Atlanta"
+        user.profile.save()
+        fresh = SavedCandidateSearch.objects.create(
+            owner=self.recruiter, name="Fresh", keywords="django", last_run_at=timezone.now()
+        )
+
+        out = StringIO()
+        call_command("run_saved_searches", workers=1, stdout=out)
+        self.assertIn("Django devs (rec): 1 new match(es)", out.getvalue())
+        self.assertNotIn("Fresh", out.getvalue())
+        self.assertFalse(fresh.matches.exists())
+
+    def test_match_list_pages_without_loading_full_profiles(self):
+        for i in range(25):
+            user = User.objects.create_user(username=f"m{i}", password="pw")
+            SavedCandidateMatch.objects.create(search=self.search, candidate=user, seen=i < 5)
+        self.client.login(username="rec", password="pw")
+        url = reverse("saved_search_matches_api", args=[self.search.pk])
+
+        first = self.client.get(url).json()
+        self.assertEqual(len(first["results"]), 20)
+        self.assertFalse(any(r["seen"] for r in first["results"]))
+        second = self.client.get(url, {"cursor": first["next_cursor"]}).json()
+        self.assertEqual(len(second["results"]), 5)
+        self.assertIsNone(second["next_cursor"])
+
+        resp = self.client.get(reverse("saved_search_matches", args=[self.search.pk]))
+        self.assertEqual(resp.status_code, 200)
+        profile = resp.context["matches"][0].candidate.profile
+        self.assertIn("experience", profile.get_deferred_fields())
+
+    def test_match_list_masks_fields_the_candidate_hides_from_recruiters(self):
+        self._candidate_match("hidden", headline="Backend dev", skills="Secret stack", location="Nowhere",
+                              show_skills_to_recruiters=False, show_location_to_recruiters=False)
+        self._candidate_match("shared", headline="Data dev", skills="SQL", location="Atlanta",
+                              show_skills_to_recruiters=True, show_location_to_recruiters=True)
+        self.client.login(username="rec", password="pw")
+
+        results = self.client.get(reverse("saved_search_matches_api", args=[self.search.pk])).json()["results"]
+        by_name = {r["username"]: r for r in results}
+        self.assertEqual((by_name["hidden"]["headline"], by_name["hidden"]["skills"], by_name["hidden"]["location"]),
+                         ("Backend dev", None, None))
+        self.assertEqual((by_name["shared"]["skills"], by_name["shared"]["location"]), ("SQL", "Atlanta"))
+
+        resp = self.client.get(reverse("saved_search_matches", args=[self.search.pk]))
+        self.assertNotContains(resp, "Secret stack")
+        self.assertNotContains(resp, "Nowhere")
+        self.assertContains(resp, "Atlanta")
+
+    def _candidate_match(self, username, **fields):
+        user = User.objects.create_user(username=username, password="pw")
+        for key, value in fields.items():
+            setattr(user.profile, key, value)
+        user.profile.save()
+        SavedCandidateMatch.objects.create(search=self.search, candidate=user)
+
+    def test_percolator_only_offers_searches_the_profile_could_satisfy(self):
+        other = SavedCandidateSearch.objects.create(owner=self.recruiter, name="Rust", keywords="rust")
+        profile = self.candidate.profile
+        profile.skills = "python django"
+        offered = {s.id for s in percolator.candidates_for(profile)}
+        self.assertIn(self.search.id, offered)
+        self.assertNotIn(other.id, offered)
+
+        other.is_active = False
+        other.save(update_fields=["is_active"])
+        profile.skills = "rust"
+        self.assertNotIn(other.id, {s.id for s in percolator.candidates_for(profile)})
+
+
+class SavedSearchEventStreamTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username="rec", password="pw")
+        self.recruiter.profile.is_recruiter = True
+        self.recruiter.profile.save()
+        SavedSearchUnreadCounter.objects.create(owner=self.recruiter, unread_count=2)
+
+    def test_wsgi_request_is_told_to_fall_back_to_polling(self):
+        self.client.login(username="rec", password="pw")
+        self.assertEqual(self.client.get(reverse("saved_search_events")).status_code, 204)
+
+    async def test_stream_pushes_published_counts(self):
+        await self.async_client.aforce_login(self.recruiter)
+        resp = await self.async_client.get(reverse("saved_search_events"))
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        stream = aiter(resp.streaming_content)
+        self.assertIn(b'data: {"count": 2}', await anext(stream))
+
+        self.assertTrue(notifier.has_listeners(self.recruiter.id))
+        notifier.publish(self.recruiter.id, 5)
+        self.assertIn(b'data: {"count": 5}', await anext(stream))
+        await stream.aclose()
+
+    async def test_quiet_stream_only_sends_keepalives(self):
+        await self.async_client.aforce_login(self.recruiter)
+        with mock.patch("home.views.SSE_HEARTBEAT_SECONDS", 0.01):
+            resp = await self.async_client.get(reverse("saved_search_events"))
+            stream = aiter(resp.streaming_content)
+            await anext(stream)
+            with mock.patch("home.views.unread_count_for") as reread:
+                self.assertEqual(await anext(stream), b": keepalive\n\n")
+                self.assertEqual(await anext(stream), b": keepalive\n\n")
+            reread.assert_not_called()
+            await stream.aclose()
+
+    async def test_refresh_publishes_counts_changed_elsewhere_in_one_query(self):
+        other = await User.objects.acreate(username="rec2")
+        await SavedSearchUnreadCounter.objects.acreate(owner=other, unread_count=1)
+        await self.async_client.aforce_login(self.recruiter)
+        stream = aiter((await self.async_client.get(reverse("saved_search_events"))).streaming_content)
+        await anext(stream)
+        quiet = notifier.subscribe(other.id, 1)
+
+        # e.g. run_saved_searches in another process: nothing is published here
+        await SavedSearchUnreadCounter.objects.filter(pk=self.recruiter.id).aupdate(unread_count=7)
+        def refresh():
+            with self.assertNumQueries(1):
+                notifier.refresh()
+
+        await sync_to_async(refresh)()
+        self.assertIn(b'data: {"count": 7}', await anext(stream))
+        # Unchanged counts aren't sent again
+        self.assertTrue(quiet.empty())
+        notifier.unsubscribe(other.id, quiet)
+        await stream.aclose()
+
+    def test_pushed_counts_follow_the_counter_outside_a_transaction(self):
+        published = []
+        with (
+            mock.patch.object(notifier, "has_listeners", return_value=True),
+            mock.patch.object(notifier, "publish", side_effect=lambda owner, n: published.append(n)),
+            mock.patch("home.services.saved_searches.transaction.on_commit", side_effect=lambda send: send()),
+        ):
+            for _ in range(3):
+                adjust_unread_counts({self.recruiter.id: 1})
+        self.assertEqual(published, [3, 4, 5])
+
+
+class JobFullTextSearchTests(TestCase):
+    def setUp(self):
+        job_snapshot.rebuild()
+        self.owner = User.objects.create_user(username="owner", password="pw")
+        self.title_hit = Job.objects.create(user=self.owner, title="Python Developer", description="Backend work")
+        self.desc_hit = Job.objects.create(user=self.owner, title="Data Engineer", description="Pipelines in Python")
+        Job.objects.create(user=self.owner, title="Java Developer", description="Spring")
+
+    def _search(self, **params):
+        resp = self.client.get(reverse("home.index"), params)
+        return [job.id for job in resp.context["template_data"]["jobs"]]
+
+    def test_all_fields_search_ranks_title_hits_first(self):
+        self.assertEqual(self._search(search="pyth", search_type="all"), [self.title_hit.id, self.desc_hit.id])
+
+    def test_title_search_ignores_description(self):
+        self.assertEqual(self._search(search="python", search_type="title"), [self.title_hit.id])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.desc_hit.title = "Python Data Engineer"
+        self.desc_hit.save()
+        self.title_hit.delete()
+        self.assertEqual(self._search(search="python"), [self.desc_hit.id])
+
+    def test_fts_triggers_match_install_fts_and_skip_unindexed_updates(self):
+        def triggers():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_fts_a_'")
+                return dict(cursor.fetchall())
+
+        migrated = triggers()
+        self.assertIn("AFTER UPDATE OF title, description, category, location ON home_job", migrated["home_job_fts_au"])
+        self.assertIn("AFTER UPDATE OF headline, skills, projects, experience, education, location ON accounts_profile",
+                      migrated["accounts_profile_fts_au"])
+        installed = {}
+        for table, content_table, columns in (
+            (JOB_FTS_TABLE, "home_job", JOB_FTS_COLUMNS),
+            (PROFILE_FTS_TABLE, "accounts_profile", PROFILE_FTS_INDEXED_COLUMNS),
+        ):
+            for sql in _fts_schema(table, content_table, columns):
+                if sql.startswith("CREATE TRIGGER"):
+                    installed[sql.split()[2]] = sql
+        self.assertEqual(installed, migrated)
+
+    def test_punctuation_only_search_lists_everything(self):
+        for term in ('"', "***", "!!"):
+            self.assertEqual(len(self._search(search=term)), 3)
+            resp = self.client.get(reverse("home.jobs_api"), {"search": term, "sort": "relevance"})
+            self.assertEqual(resp.status_code, 200)
+        self.assertEqual(list(paginate_ranked_jobs(search_jobs(Job.objects.all(), "***")).items), [])
+
+
+class JobListingPaginationTests(TestCase):
+    def setUp(self):
+        job_snapshot.rebuild()
+        self.owner = User.objects.create_user(username="owner", password="pw")
+        self.jobs = [
+            Job.objects.create(user=self.owner, title=f"Engineer {i}", salary=1000 * (i % 3))
+            for i in range(7)
+        ]
+
+    def _walk(self, **params):
+        seen, cursor = [], None
+        while True:
+            query = dict(params, page_size=3, **({"cursor": cursor} if cursor else {}))
+            resp = self.client.get(reverse("home.index"), query)
+            data = resp.context["template_data"]
+            seen += [job.id for job in data["jobs"]]
+            if not data["next_query"]:
+                return seen
+            cursor = data["next_query"].split("cursor=")[1].split("&")[0]
+
+    def test_newest_first_walks_every_job_once(self):
+        self.assertEqual(self._walk(), [job.id for job in reversed(self.jobs)])
+
+    def test_salary_sort_breaks_ties_by_id(self):
+        expected = [j.id for j in sorted(self.jobs, key=lambda j: (-j.salary, -j.id))]
+        self.assertEqual(self._walk(sort="salary_high"), expected)
+
+    def test_relevance_pages_follow_rank(self):
+        ids = self._walk(search="engineer")
+        self.assertEqual(sorted(ids), sorted(j.id for j in self.jobs))
+        self.assertEqual(len(ids), len(set(ids)))
+
+
+class JobFacetCountTests(TestCase):
+    def setUp(self):
+        job_snapshot.rebuild()
+        self.owner = User.objects.create_user(username="owner", password="pw")
+
+    def _counts(self, facet):
+        return dict(JobFacetCount.objects.filter(facet=facet, count__gt=0).values_list("value", "count"))
+
+    def test_counts_follow_job_create_edit_and_delete(self):
+        a = Job.objects.create(user=self.owner, title="A", category="Tech", location="Atlanta, GA", salary=60000)
+        Job.objects.create(user=self.owner, title="B", category="Tech", location=" atlanta", salary=120000)
+        self.assertEqual(self._counts("category"), {"Tech": 2})
+        self.assertEqual(self._counts("location"), {"Atlanta": 2})
+        self.assertEqual(self._counts("salary"), {"50000-100000": 1, "100000-150000": 1})
+
+        a.category, a.location = "Design", "Austin, TX"
+        a.save()
+        self.assertEqual(self._counts("category"), {"Tech": 1, "Design": 1})
+        self.assertEqual(self._counts("location"), {"Atlanta": 1, "Austin": 1})
+
+        a.delete()
+        self.assertEqual(self._counts("category"), {"Tech": 1})
+
+        JobFacetCount.objects.all().delete()
+        call_command("rebuild_job_facets", stdout=StringIO())
+        self.assertEqual(self._counts("location"), {"Atlanta": 1})
+
+    def test_search_shows_counts_for_the_matching_jobs_only(self):
+        Job.objects.create(user=self.owner, title="Python Dev", category="Tech", salary=60000)
+        Job.objects.create(user=self.owner, title="Python Analyst", category="Data", salary=60000)
+        Job.objects.create(user=self.owner, title="Java Dev", category="Tech", salary=60000)
+
+        resp = self.client.get(reverse("home.index"), {"search": "python"})
+        facets = {s["name"]: s["links"] for s in resp.context["template_data"]["facets"]}
+        self.assertEqual({(l["label"], l["count"]) for l in facets["Category"]}, {("Tech", 1), ("Data", 1)})
+        self.assertContains(resp, "Tech (1)")
+
+        # The link narrows the search rather than replacing it, on both query paths
+        tech = next(l for l in facets["Category"] if l["label"] == "Tech")
+        for sort in ("newest", "relevance"):
+            resp = self.client.get(f"{reverse('home.index')}?{tech['query']}&sort={sort}")
+            self.assertEqual([j.title for j in resp.context["template_data"]["jobs"]], ["Python Dev"])
+
+        resp = self.client.get(reverse("home.index"))
+        self.assertContains(resp, "Tech (2)")
+
+
+class JobSnapshotTests(TestCase):
+    def setUp(self):
+        job_snapshot.rebuild()
+        self.owner = User.objects.create_user(username="owner", password="pw")
+        self.client.login(username="owner", password="pw")
+
+    def _index_ids(self, **params):
+        resp = self.client.get(reverse("home.index"), dict(params, sort="newest"))
+        return [job.id for job in resp.context["template_data"]["jobs"]]
+
+    def test_filters_match_the_database_and_follow_the_change_log(self):
+        dev = Job.objects.create(user=self.owner, title="Python Developer", category="Tech", salary=90000)
+        Job.objects.create(user=self.owner, title="Python Tutor", category="Education", salary=40000)
+        Job.objects.create(user=self.owner, title="Go Developer", category="Tech", salary=95000)
+
+        expected = list(
+            Job.objects.filter(title__icontains="developer", salary__gte=50000).order_by("-date", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(self._index_ids(search="develop", min_salary="50000"), expected)
+
+        dev.title = "Rust Engineer"
+        dev.save()
+        self.assertEqual(self._index_ids(search="python"), [j.id for j in Job.objects.filter(title="Python Tutor")])
+        dev.delete()
+        self.assertEqual(len(self._index_ids()), 2)
+
+    def test_facet_filters_combine_with_salary_bounds(self):
+        tech = Job.objects.create(user=self.owner, title="Backend", category="Tech", salary=120000)
+        Job.objects.create(user=self.owner, title="Cheap", category="Tech", salary=40000)
+        Job.objects.create(user=self.owner, title="Account exec", category="Sales", salary=130000)
+
+        self.assertEqual(self._index_ids(category="Tech", min_salary="100000"), [tech.id])
+        self.assertEqual(self._index_ids(category="Tech", min_salary="100000", max_salary="125000"), [tech.id])
+        body = self.client.get(reverse("home.jobs_api"), {"category": "Tech", "min_salary": "100000"}).json()
+        self.assertEqual([r["id"] for r in body["results"]], [tech.id])
+
+    def test_sort_orders_are_updated_in_place(self):
+        low = Job.objects.create(user=self.owner, title="A", salary=10)
+        high = Job.objects.create(user=self.owner, title="B", salary=20)
+        ordering = ("-salary", "-id")
+        self.assertEqual(job_snapshot.page(ordering).ids, [high.id, low.id])
+        keys, rows = job_snapshot._orders[ordering]
+
+        low.salary = 30
+        low.save()
+        self.assertEqual(job_snapshot.page(ordering, min_salary=15).ids, [low.id, high.id])
+        self.assertIs(job_snapshot._orders[ordering][1], rows)
+        high.delete()
+        self.assertEqual(job_snapshot.page(ordering).ids, [low.id])
+
+    def test_prune_change_log_keeps_the_newest_entry(self):
+        for i in range(3):
+            Job.objects.create(user=self.owner, title=f"Job {i}")
+        JobChangeLog.objects.update(changed_at=timezone.now() - timedelta(days=2))
+        latest = JobChangeLog.objects.latest("id")
+        call_command("prune_job_changelog", stdout=StringIO())
+        self.assertEqual(list(JobChangeLog.objects.all()), [latest])
+
+    def test_map_data_only_returns_geocoded_jobs_in_range(self):
+        Job.objects.create(user=self.owner, title="Atlanta", location="Atlanta", latitude=33.75, longitude=-84.39)
+        Job.objects.create(user=self.owner, title="Seattle", location="Seattle", latitude=47.61, longitude=-122.33)
+        Job.objects.create(user=self.owner, title="Nowhere", location="Nowhere")
+
+        data = self.client.get(reverse("home.map_data_api")).json()
+        self.assertEqual([c["location"] for c in data], ["Atlanta", "Seattle"])
+
+
+class GeocodeCacheTests(TestCase):
+    def setUp(self):
+        geocode_lru.clear()
+
+    def test_answers_and_misses_are_cached_by_normalized_address(self):
+        with mock.patch("home.services.geocoding._fetch", return_value=("OK", 33.75, -84.39)) as fetch:
+            self.assertEqual(geocode_location("Atlanta,GA"), (33.75, -84.39))
+            self.assertEqual(geocode_location("  atlanta,  ga "), (33.75, -84.39))
+            geocode_lru.clear()
+            # Another process: the table answers, no API call
+            self.assertEqual(geocode_location("Atlanta, GA"), (33.75, -84.39))
+        self.assertEqual(fetch.call_count, 1)
+
+        with mock.patch("home.services.geocoding._fetch", return_value=("ZERO_RESULTS", None, None)) as fetch:
+            self.assertEqual(geocode_location("Nowhere"), (None, None))
+            self.assertEqual(geocode_location("nowhere"), (None, None))
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(GeocodeCache.objects.get(address="nowhere").status, "ZERO_RESULTS")
+
+    def test_expired_entries_are_fetched_again(self):
+        GeocodeCache.objects.create(address="seattle", latitude=1, longitude=2, status="OK",
+                                    expires_at=timezone.now() - timedelta(seconds=1))
+        with mock.patch("home.services.geocoding._fetch", return_value=("OK", 47.61, -122.33)):
+            self.assertEqual(geocode_location("Seattle"), (47.61, -122.33))
+        self.assertEqual(GeocodeCache.objects.get(address="seattle").latitude, 47.61)
+
+
+class AnonymousJobPageCacheTests(TestCase):
+    def setUp(self):
+        job_snapshot.rebuild()
+        self.owner = User.objects.create_user(username="owner", password="pw")
+        self.job = Job.objects.create(user=self.owner, title="Cached Role", category="Tech", salary=50000)
+
+    def test_repeat_hits_are_served_from_cache_until_a_job_changes(self):
+        url = reverse("home.index")
+        self.client.get(url, {"sort": "newest", "search": ""})
+        # Only the generation lookup; blank params share the normalized key
+        with self.assertNumQueries(1):
+            resp = self.client.get(url, {"sort": "newest"})
+        self.assertContains(resp, "Cached Role")
+
+        self.job.title = "Renamed Role"
+        self.job.save()
+        resp = self.client.get(url, {"sort": "newest"})
+        self.assertContains(resp, "Renamed Role")
+
+    def test_escaped_values_do_not_share_a_key(self):
+        smuggled = RequestFactory().get("/", {"search": "python&sort=salary_high"})
+        split = RequestFactory().get("/", {"search": "python", "sort": "salary_high"})
+        self.assertNotEqual(_page_key(smuggled, JOB_PAGE_PARAMS, "1"), _page_key(split, JOB_PAGE_PARAMS, "1"))
+
+    def test_signed_in_users_are_not_cached(self):
+        url = reverse("home.index")
+        self.client.get(url)
+        # a write that skips the signals leaves the generation alone
+        Job.objects.filter(pk=self.job.pk).update(title="Quietly Renamed")
+        self.assertContains(self.client.get(url), "Cached Role")
+
+        self.client.login(username="owner", password="pw")
+        self.assertContains(self.client.get(url), "Quietly Renamed")
+
+
+class JobsApiTests(TestCase):
+    def setUp(self):
+        job_snapshot.rebuild()
+        owner = User.objects.create_user(username="owner", password="pw")
+        self.jobs = [
+            Job.objects.create(user=owner, title=f"Python dev {i}", description="long text", salary=50000 + i)
+            for i in range(3)
+        ]
+        Job.objects.create(user=owner, title="Go dev", salary=99000)
+
+    def test_filters_pages_and_sparse_fields(self):
+        url = reverse("home.jobs_api")
+        params = {"search": "python", "sort": "salary_high", "page_size": 2, "fields": "id,title,salary"}
+        body = self.client.get(url, params).json()
+        self.assertEqual([r["id"] for r in body["results"]], [self.jobs[2].id, self.jobs[1].id])
+        self.assertEqual(set(body["results"][0]), {"id", "title", "salary"})
+
+        rest = self.client.get(url, dict(params, cursor=body["next_cursor"])).json()
+        self.assertEqual([r["id"] for r in rest["results"]], [self.jobs[0].id])
+        self.assertIsNone(rest["next_cursor"])
+
+        self.assertEqual(self.client.get(url, {"fields": "id,password"}).status_code, 400)
+
+    def test_differently_encoded_queries_get_different_etags(self):
+        url = reverse("home.jobs_api")
+        split = self.client.get(url, {"search": "python", "sort": "salary_high"})
+        smuggled = self.client.get(url, {"search": "python&sort=salary_high"})
+        self.assertNotEqual(split.json()["results"], smuggled.json()["results"])
+        self.assertNotEqual(split["ETag"], smuggled["ETag"])
+        resp = self.client.get(url, {"search": "python&sort=salary_high"}, HTTP_IF_NONE_MATCH=split["ETag"])
+        self.assertEqual(resp.status_code, 200)
+
+    def test_non_numeric_salary_is_a_bad_request(self):
+        url = reverse("home.jobs_api")
+        for params in ({"min_salary": "abc"}, {"max_salary": "abc", "search": "python", "sort": "relevance"},
+                       {"min_salary": "nan"}):
+            resp = self.client.get(url, params)
+            self.assertEqual(resp.status_code, 400)
+            self.assertIn("must be a number", resp.json()["error"])
+        # The page ignores the bad bound rather than failing
+        resp = self.client.get(reverse("home.index"), {"min_salary": "abc", "search": "python", "sort": "relevance"})
+        self.assertEqual(len(resp.context["template_data"]["jobs"]), 3)
+
+    def test_etag_revalidates_until_a_job_changes(self):
+        url = reverse("home.jobs_api")
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.client.get(url, {"fields": "id"})["ETag"], etag)
+
+        self.jobs[0].title = "Python lead"
+        self.jobs[0].save()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+
+class JobSuggestionTests(TestCase):
+    def setUp(self):
+        job_snapshot.rebuild()
+        self.owner = User.objects.create_user(username="owner", password="pw")
+        for title in ("Python Developer", "Python Developer", "Senior Python Engineer", "Product Designer"):
+            Job.objects.create(user=self.owner, title=title, category="Tech", location="Portland, OR")
+
+    def _suggest(self, q, **params):
+        resp = self.client.get(reverse("home.job_suggest_api"), dict(params, q=q))
+        return [(s["field"], s["value"], s["count"]) for s in resp.json()["suggestions"]]
+
+    def test_word_prefixes_rank_by_frequency(self):
+        self.assertEqual(
+            self._suggest("pyth", field="title"),
+            [("title", "Python Developer", 2), ("title", "Senior Python Engineer", 1)],
+        )
+        self.assertEqual(self._suggest("p"), [
+            ("location", "Portland", 4),
+            ("title", "Python Developer", 2),
+            ("title", "Product Designer", 1),
+            ("title", "Senior Python Engineer", 1),
+        ])
+
+    def test_keystrokes_stay_in_memory_and_follow_job_changes(self):
+        self._suggest("pro")
+        with self.assertNumQueries(0):
+            self.assertEqual(self._suggest("prod"), [("title", "Product Designer", 1)])
+
+        Job.objects.get(title="Product Designer").delete()
+        with mock.patch("home.services.job_snapshot.SUGGEST_MAX_AGE_SECONDS", 0):
+            self.assertEqual(self._suggest("prod"), [])
+
+
+class FuzzySearchTests(TestCase):
+    def setUp(self):
+        job_snapshot.rebuild()
+        percolator.rebuild()
+        self.owner = User.objects.create_user(username="owner", password="pw")
+        self.python = Job.objects.create(user=self.owner, title="Python Developer", category="Software")
+        self.k8s = Job.objects.create(user=self.owner, title="Kubernetes Engineer", category="Infrastructure")
+
+    def _search(self, **params):
+        resp = self.client.get(reverse("home.index"), params)
+        return [job.id for job in resp.context["template_data"]["jobs"]]
+
+    def test_misspelled_words_match_only_in_fuzzy_mode(self):
+        self.assertEqual(self._search(search="pyhton"), [])
+        self.assertEqual(self._search(search="pyhton", fuzzy="1"), [self.python.id])
+        self.assertEqual(self._search(search="kubernets", fuzzy="1", sort="newest"), [self.k8s.id])
+        self.assertEqual(self._search(search="infrastucture", search_type="category", fuzzy="1"), [self.k8s.id])
+
+    def test_similar_terms_are_verified_and_ranked(self):
+        Job.objects.create(user=self.owner, title="Pythons and Pylons")
+        # one swap away; "pythons" and "pylons" share trigrams but are two edits off
+        self.assertEqual(similar_terms([SearchTrigram.Source.JOB_TITLE], "pyhton"), ["python"])
+        self.assertEqual(similar_terms([SearchTrigram.Source.JOB_TITLE], "pythonn"), ["python", "pythons"])
+        self.assertEqual(similar_terms([SearchTrigram.Source.JOB_TITLE], "go"), [])
+
+    def test_fuzzy_saved_search_matches_misspelled_keywords(self):
+        recruiter = User.objects.create_user(username="rec", password="pw")
+        search = SavedCandidateSearch.objects.create(owner=recruiter, name="k8s", keywords="kubernets", fuzzy=True)
+        candidate = User.objects.create_user(username="cand", password="pw")
+        candidate.profile.skills = "Kubernetes, Helm"
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate.profile.save()
+        self.assertTrue(search.matches.filter(candidate=candidate).exists())
+
+        search.matches.all().delete()
+        self.assertEqual(run_search_and_record_new_matches(search, full=True), 1)
+
+
+class CandidateListingTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username="rec", password="pw")
+        self.recruiter.profile.is_recruiter = True
+        self.recruiter.profile.save()
+        self.client.login(username="rec", password="pw")
+
+    def _candidate(self, username, **fields):
+        user = User.objects.create_user(username=username, password="pw")
+        for key, value in fields.items():
+            setattr(user.profile, key, value)
+        user.profile.save()
+        return user
+
+    def test_private_and_empty_profiles_are_filtered_in_sql_and_fields_masked(self):
+        self._candidate("hidden", skills="Go", show_skills_to_recruiters=True, visibility=Profile.Visibility.PRIVATE)
+        self._candidate("blank", skills="", show_skills_to_recruiters=True)
+        self._candidate("unshared", skills="Go", show_skills_to_recruiters=False)
+        for i in range(3):
+            self._candidate(f"dev{i}", skills="Go", show_skills_to_recruiters=True, email="x@y.z")
+
+        seen, cursor = [], None
+        while True:
+            resp = self.client.get(reverse("home.candidates"), {"page_size": 2, **({"cursor": cursor} if cursor else {})})
+            seen += resp.context["profiles"]
+            if not resp.context["next_query"]:
+                break
+            cursor = resp.context["next_query"].split("cursor=")[1].split("&")[0]
+
+        self.assertEqual(sorted(p["username"] for p in seen), ["dev0", "dev1", "dev2"])
+        self.assertTrue(all(p["skills"] == "Go" and p["email"] is None for p in seen))
+
+    def test_shares_filter_is_one_predicate_on_the_recruiter_fields_mask(self):
+        both = self._candidate("both", skills="Go", location="Oslo",
+                               show_skills_to_recruiters=True, show_location_to_recruiters=True)
+        self._candidate("skills_only", skills="Go", location="Oslo", show_skills_to_recruiters=True)
+        self.assertEqual(both.profile.recruiter_fields, recruiter_fields_mask("skills", "location"))
+
+        resp = self.client.get(reverse("home.candidates"), {"shares": ["skills", "location"]})
+        self.assertEqual([p["username"] for p in resp.context["profiles"]], ["both"])
+
+        # A quiet toggle through update_fields still keeps the mask in step
+        both.profile.show_location_to_recruiters = False
+        both.profile.save(update_fields=["show_location_to_recruiters"])
+        both.profile.refresh_from_db()
+        self.assertFalse(both.profile.shows_to_recruiters("location"))
+        self.assertFalse(both.profile.can_view(self.recruiter, "location"))
+
+    def test_profile_edits_while_paging_neither_skip_nor_repeat_candidates(self):
+        users = [self._candidate(f"dev{i}", skills="Go", show_skills_to_recruiters=True) for i in range(4)]
+        url = reverse("home.candidates")
+        first = self.client.get(url, {"page_size": 2})
+        # The two still to come edit their profiles before the recruiter pages on
+        for user in users[:2]:
+            user.profile.headline = "Updated"
+            user.profile.save()
+        second = self.client.get(f"{url}?{first.context['next_query']}")
+        seen = [p["username"] for r in (first, second) for p in r.context["profiles"]]
+        self.assertEqual(seen, ["dev3", "dev2", "dev1", "dev0"])
+
+    def test_location_filter_matches_words_in_the_location_only(self):
+        self._candidate("atl", skills="Go", location="Atlanta, GA", show_skills_to_recruiters=True)
+        self._candidate("sf", skills="Go", location="San Francisco", show_skills_to_recruiters=True)
+        self._candidate("fan", skills="Go", headline="Atlanta fan", location="Oslo", show_skills_to_recruiters=True)
+
+        for term in ("atlanta", "ATL", "Atlanta, GA"):
+            resp = self.client.get(reverse("home.candidates"), {"location": term})
+            self.assertEqual([p["username"] for p in resp.context["profiles"]], ["atl"], term)
+        # The location stays out of keyword searches
+        resp = self.client.get(reverse("home.candidates"), {"skills": "francisco"})
+        self.assertEqual(resp.context["profiles"], [])
+
+
+class QueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN over every query the hot views issue against a
+    seeded database and fails when one reads a whole table, by a plain SCAN
+    or by walking a whole index. The only walk allowed is an unfiltered one
+    that a LIMIT cuts short: it reads exactly the rows it returns.
+    """
+
+    # Unfiltered keyset listings page down their ordering index. Their WHERE
+    # (active, non-private candidates) passes nearly every row, so the LIMIT
+    # ends the walk after about a page. Filtered requests get no such pass.
+    PAGED_WALKS = {"home.candidates": "accounts_profile"}
+
+    HOT_VIEWS = (
+        ("home.index", (), {"search": "python", "sort": "relevance"}),
+        ("home.index", (), {"sort": "salary_high", "min_salary": 5}),
+        ("home.jobs_api", (), {"search": "python", "fields": "id,title,description"}),
+        ("home.show", ("job",), {}),
+        ("home.candidates", (), {}),
+        ("home.candidates", (), {"skills": "python", "shares": ["skills"]}),
+        ("home.candidates", (), {"location": "atlanta"}),
+        ("home.recruiter_recs", ("job",), {}),
+        ("pipeline-board", (), {}),
+        ("pipeline-board-job", ("job",), {}),
+        ("home.applicant_map", (), {}),
+        ("home.applicant_map_data", (), {"job_id": "all"}),
+        ("messaging:inbox", (), {}),
+        ("messaging:conversation_detail", ("app",), {}),
+    )
+
+    def setUp(self):
+        self.recruiter = User.objects.create_user(username="rec", password="pw")
+        self.recruiter.profile.is_recruiter = True
+        self.recruiter.profile.save()
+        self.job = None
+        for i in range(3):
+            self.job = Job.objects.create(user=self.recruiter, title=f"Python dev {i}", description="Django",
+                                          salary=90000 + i, location="Atlanta, GA", category="Tech")
+        for i in range(4):
+            user = User.objects.create_user(username=f"cand{i}", password="pw")
+            user.profile.skills = "Python"
+            user.profile.location = "Atlanta, GA"
+            user.profile.show_skills_to_recruiters = True
+            user.profile.save()
+            self.app = Application.objects.create(job=self.job, applicant=user)
+        conv = Conversation.objects.create(application=self.app)
+        Message.objects.create(conversation=conv, sender=self.app.applicant, body="Hi")
+        # Loading the snapshot reads every job on purpose; keep it out of the plans
+        job_snapshot.rebuild()
+        self.client.login(username="rec", password="pw")
+
+    def plans(self, name, args=(), params=None):
+        """(sql, plan detail lines) for each data query one GET runs."""
+        ids = {"job": self.job.id, "app": self.app.id}
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse(name, args=[ids[a] for a in args]), params or {})
+        self.assertEqual(resp.status_code, 200, name)
+        plans = []
+        with connection.cursor() as cursor:
+            for query in ctx.captured_queries:
+                sql = query["sql"]
+                if not sql.lstrip().startswith(("SELECT", "UPDATE", "DELETE")) or "sqlite_master" in sql:
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    @staticmethod
+    def full_scans(sql, plan, paged_walk=None):
+        scans = [line for line in plan if re.fullmatch(r"SCAN \w+( USING (COVERING )?INDEX \w+)?", line)]
+        if " LIMIT " not in sql or any("TEMP B-TREE" in line for line in plan):
+            return scans
+        # An unfiltered LIMIT read in index order stops early (e.g. the latest change log row)
+        if " WHERE " not in sql:
+            return []
+        return [line for line in scans if line.split()[1] != paged_walk]
+
+    def test_hot_views_never_scan_a_whole_table(self):
+        for name, args, params in self.HOT_VIEWS:
+            paged_walk = None if params else self.PAGED_WALKS.get(name)
+            for sql, plan in self.plans(name, args, params):
+                with self.subTest(view=name, params=params, sql=sql[:120]):
+                    self.assertEqual(self.full_scans(sql, plan, paged_walk), [], plan)
+
+    def test_ordered_listings_read_straight_off_their_indexes(self):
+        def plan_for(name, args, table):
+            return next(plan for sql, plan in self.plans(name, args) if f'FROM "{table}"' in sql)
+
+        recruiter_jobs = plan_for("home.applicant_map", (), "home_job")
+        self.assertIn("home_job_user_id_0480df_idx", " ".join(recruiter_jobs))
+        pipeline = plan_for("pipeline-board-job", ("job",), "home_application")
+        self.assertIn("home_applic_job_id_fb5871_idx", " ".join(pipeline))
+        for plan in (recruiter_jobs, pipeline):
+            self.assertFalse([line for line in plan if "TEMP B-TREE" in line], plan)
+
+        mark_read = next(
+            plan for sql, plan in self.plans("messaging:conversation_detail", ("app",))
+            if sql.startswith('UPDATE "messaging_message"')
+        )
+        self.assertIn("(conversation_id=? AND read_at=?)", " ".join(mark_read))
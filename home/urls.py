@@ -3,6 +3,8 @@ from . import views
 urlpatterns = [
     path('', views.index, name='home.index'),
     path('about/', views.about, name='home.about'),
+    path('api/jobs/', views.jobs_api, name='home.jobs_api'),
+    path('api/jobs/suggest/', views.job_suggestions_api, name='home.job_suggest_api'),
     path('<int:id>/', views.show, name='home.show'),
     path('<int:id>/apply/', views.apply_job, name='home.apply'),
     path('<int:id>/move/', views.move_app, name='home.move_app'),
@@ -18,13 +20,17 @@ urlpatterns = [
     path('jobs/<int:job_id>/recommended-candidates/', views.recruiter_recommendations, name='home.recruiter_recs'),
     path('recommendations/candidates/<int:rec_id>/dismiss/', views.dismiss_candidate_recommendation, name='home.dismiss_candidate'),
     path('recommended-jobs/', views.job_recommendations, name='home.job_recs'),
+    path('api/jobs/<int:job_id>/recommended-candidates/', views.recruiter_recommendations_api, name='home.recruiter_recs_api'),
+    path('api/recommended-jobs/', views.job_recommendations_api, name='home.job_recs_api'),
     path('recommendations/jobs/<int:rec_id>/dismiss/', views.dismiss_job_recommendation, name='home.dismiss_job'),
     # Saved Search URLs
     path("saved-searches/", views.saved_search_list, name="saved_search_list"),
     path("saved-searches/new", views.saved_search_create, name="saved_search_create"),
     path("saved-searches/<int:pk>/toggle", views.saved_search_toggle, name="saved_search_toggle"),
     path("saved-searches/<int:pk>/matches", views.saved_search_matches, name="saved_search_matches"),
+    path("api/saved-searches/<int:pk>/matches", views.saved_search_matches_api, name="saved_search_matches_api"),
     path("notifications/unread-count", views.saved_search_unread_count, name="saved_search_unread_count"),
+    path("notifications/events", views.saved_search_events, name="saved_search_events"),
     path("notifications/mark-seen", views.saved_search_mark_seen, name="saved_search_mark_seen"),
     path('job_map/', views.job_map, name='home.job_map'),
     path('api/map_data_api/', views.map_data_api, name='home.map_data_api'),
@@ -4,52 +4,295 @@ from django.contrib import messages
 from django.views.decorators.http import require_POST
 from .models import Job, CandidateRecommendation, JobRecommendation, Application
 from django.contrib.auth.decorators import login_required
-from decimal import Decimal
-from accounts.models import Profile
+from decimal import Decimal, InvalidOperation
+from accounts.models import RECRUITER_FIELD_BITS, Profile, shares_recruiter_fields
 from .recommendations import generate_candidate_recommendations, generate_job_recommendations
 from django.db import models
-from django.http import JsonResponse, HttpResponseForbidden, Http404
-from django.db.models import Prefetch
+from django.http import (
+    JsonResponse, HttpResponse, HttpResponseForbidden, HttpResponseNotModified, Http404, StreamingHttpResponse,
+)
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from django.db.models import Case, F, Prefetch, Q, Value, When
+from django.db.models.lookups import Exact
 from django.conf import settings
 from home.forms import SavedCandidateSearchForm
-from home.models import SavedCandidateSearch, SavedCandidateMatch
-from home.services.saved_searches import run_search_and_record_new_matches
+from home.models import JobFacetCount, SavedCandidateSearch, SavedCandidateMatch, SearchTrigram
+from home.services.saved_searches import run_search_and_record_new_matches, unread_count_for, mark_all_seen
+from home.services.pagination import KeysetPage, decode_cursor, encode_cursor, paginate_keyset, page_size_from
+from home.services.notifier import notifier
+from home.services.page_cache import cache_anonymous_job_page, job_page_etag
+from home.services.candidate_search import filter_profiles_by_keywords
+from home.services.facets import filtered_facet_counts, salary_bucket_bounds, stored_facet_counts
+from home.services.fulltext import query_groups
+from home.services.fuzzy import fuzzy_groups
+from home.services.geocoding import geocode_location
+from home.services.job_snapshot import SEARCHABLE_COLUMNS as SNAPSHOT_COLUMNS, job_snapshot
+from home.services.job_search import (
+    JOB_FTS_COLUMNS, RANK_ORDERING, job_fts_available, paginate_ranked_jobs, restrict_to_ids, search_jobs,
+)
+import asyncio
+import json
 import math
 
-import requests
 
 # Create your views here.
-def index(request):
+JOB_SEARCH_TYPES = {
+    'title': ('title',),
+    'location': ('location',),
+    'category': ('category',),
+    'all': JOB_FTS_COLUMNS,
+}
+# Trigram vocabularies that fuzzy mode draws spelling alternatives from
+JOB_FUZZY_SOURCES = {
+    'title': [SearchTrigram.Source.JOB_TITLE],
+    'location': [],
+    'category': [SearchTrigram.Source.JOB_CATEGORY],
+    'all': [SearchTrigram.Source.JOB_TITLE, SearchTrigram.Source.JOB_CATEGORY],
+}
+
+# Job board sort options -> keyset ordering; each has a matching Job index
+JOB_SORTS = {
+    'newest': ('-date', '-id'),
+    'salary_high': ('-salary', '-id'),
+    'salary_low': ('salary', 'id'),
+}
+# Every query parameter index() reads; the anonymous page cache keys on these
+JOB_PAGE_PARAMS = (
+    'search', 'search_type', 'fuzzy', 'min_salary', 'max_salary', 'category', 'location', 'sort', 'cursor', 'page_size',
+)
+JOB_SALARY_PARAMS = ('min_salary', 'max_salary')
+# Facet drill-down parameters: exact facet values, on top of any search
+JOB_FACET_FILTERS = (JobFacetCount.Facet.CATEGORY, JobFacetCount.Facet.LOCATION)
+# Only what a job card renders, plus the sort keys the cursor needs
+JOB_CARD_FIELDS = ('id', 'title', 'category', 'location', 'salary', 'date')
+
+# Columns /api/jobs/ can return through fields=; job cards by default
+JOB_API_FIELDS = ('id', 'title', 'description', 'category', 'location', 'salary', 'date', 'latitude', 'longitude')
+JOB_API_PARAMS = JOB_PAGE_PARAMS + ('fields',)
+
+def _job_load_fields(fields, ordering):
+    # The requested columns plus whatever the cursor is built from
+    return {'id', *fields, *(name.lstrip('-') for name in ordering if name != 'rank')}
+
+def _snapshot_job_page(request, ordering, search_term, columns, min_salary, max_salary, page_size, facets,
+                       fields=JOB_CARD_FIELDS, facet_filters=None):
+    """
+    Resolve a job board page from the in-memory snapshot, or return None if
+    it can't answer this query (relevance order, description search) and
+    the database should.
+    """
+    if search_term and not set(columns) <= set(SNAPSHOT_COLUMNS):
+        return None
+    after = decode_cursor(request.GET.get('cursor'), Job, ordering)
+    result = job_snapshot.page(
+        ordering, after, page_size, min_salary=min_salary, max_salary=max_salary,
+        term=search_term or None, columns=columns, facets=facets, facet_filters=facet_filters,
+    )
+    rows = Job.objects.only(*_job_load_fields(fields, ordering)).in_bulk(result.ids)
+    page = KeysetPage(items=[rows[i] for i in result.ids if i in rows])
+    if result.has_next and page.items:
+        page.next_cursor = encode_cursor(page.items[-1], ordering)
+    return page, result.facets
+
+def _salary_bound(value):
+    """A salary filter as a finite Decimal, None when absent; ValueError if it isn't a number."""
+    if not value:
+        return None
+    try:
+        bound = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(value) from None
+    if not bound.is_finite():
+        raise ValueError(value)
+    return bound
+
+def _salary_bounds(request):
+    # index() ignores a bound that isn't a number; jobs_api() rejects it up front
+    bounds = []
+    for name in JOB_SALARY_PARAMS:
+        try:
+            bounds.append(_salary_bound(request.GET.get(name)))
+        except ValueError:
+            bounds.append(None)
+    return bounds
+
+def _job_facet_filters(request):
+    return {facet: value for facet in JOB_FACET_FILTERS if (value := request.GET.get(facet))}
+
+def _job_board_page(request, fields=JOB_CARD_FIELDS, facets=False):
+    """
+    One keyset page of the job board for the filters in request.GET, shared
+    by index() and jobs_api(). Only `fields` (plus the sort keys) are
+    loaded. Returns (page, sort, ranked, counts); counts are the facet
+    counts of a filtered query when `facets` is set, otherwise None.
+    """
     search_term = request.GET.get('search')
+    if search_term and not query_groups(search_term):
+        # Only punctuation ("***", '"'): nothing to match or rank on
+        search_term = None
     search_type = request.GET.get('search_type')
-    min_salary = request.GET.get('min_salary')
-    max_salary = request.GET.get('max_salary')
-
-    jobs = Job.objects.all()
-    app = Application.objects.all()
+    min_salary, max_salary = _salary_bounds(request)
+    sort = request.GET.get('sort')
+
+    fuzzy = request.GET.get('fuzzy') == '1'
+
+    ranked = bool(search_term) and job_fts_available()
+    columns = JOB_SEARCH_TYPES.get(search_type, JOB_SEARCH_TYPES['title'])
+    query = search_term
+    if search_term and fuzzy:
+        # Each word also matches its close spellings from the trigram index
+        query = fuzzy_groups(search_term, JOB_FUZZY_SOURCES.get(search_type, JOB_FUZZY_SOURCES['title']))
+    if sort not in JOB_SORTS and not (sort == 'relevance' and ranked):
+        sort = 'relevance' if ranked else 'newest'
+    cursor, page_size = request.GET.get('cursor'), page_size_from(request)
+    facet_filters = _job_facet_filters(request)
+    facets = facets and bool(search_term or min_salary is not None or max_salary is not None or facet_filters)
+
+    # Filter and sort in memory where possible; the database then serves just the page
+    snapshot = None
+    if sort != 'relevance':
+        snapshot = _snapshot_job_page(
+            request, JOB_SORTS[sort], query, columns, min_salary, max_salary, page_size, facets, fields,
+            facet_filters,
+        )
 
-    if search_term:
-        if search_type in {'title', 'location', 'category'}:
-            lookup = {f"{search_type}__icontains": search_term}
+    if snapshot is not None:
+        page, counts = snapshot
+    else:
+        jobs = Job.objects.only(*_job_load_fields(fields, JOB_SORTS.get(sort, RANK_ORDERING)))
+        if search_term:
+            # Full-text index with bm25 ranking on SQLite, icontains elsewhere
+            jobs = search_jobs(jobs, query, columns)
+        if facet_filters:
+            # Facet values are normalized in Python; the snapshot knows which jobs have them
+            jobs = restrict_to_ids(jobs, job_snapshot.ids_with_facets(facet_filters))
+        if min_salary is not None:
+            jobs = jobs.filter(salary__gte=min_salary)
+        if max_salary is not None:
+            jobs = jobs.filter(salary__lte=max_salary)
+
+        if sort == 'relevance':
+            page = paginate_ranked_jobs(jobs, cursor, page_size)
         else:
-            lookup = {"title__icontains": search_term}
-        jobs = jobs.filter(**lookup)
-    if min_salary:
-        jobs = jobs.filter(salary__gte=min_salary)
-    if max_salary:
-        jobs = jobs.filter(salary__lte=max_salary)
+            page = paginate_keyset(jobs, JOB_SORTS[sort], cursor, page_size)
+        counts = filtered_facet_counts(jobs) if facets else None
+    return page, sort, ranked, counts
+
+@cache_anonymous_job_page(JOB_PAGE_PARAMS)
+def index(request):
+    search_term = request.GET.get('search')
+    page, sort, ranked, counts = _job_board_page(request, facets=True)
+
+    next_query = None
+    if page.next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_query = params.urlencode()
+
+    facets = _job_facet_links(request, counts if counts is not None else stored_facet_counts())
+    active_facets = []
+    for facet, value in _job_facet_filters(request).items():
+        params = request.GET.copy()
+        params.pop('cursor', None)
+        params.pop(facet)
+        active_facets.append({'name': facet, 'value': value, 'remove_query': params.urlencode()})
 
     template_data = {
         'title': 'Jobs',
-        'jobs': jobs,
+        'jobs': page.items,
         'search_term': search_term or '',
-        'search_type': search_type or 'title',
-        'min_salary': min_salary or '',
-        'max_salary': max_salary or '',
-        'applications': app
+        'search_type': request.GET.get('search_type') or 'title',
+        'fuzzy': request.GET.get('fuzzy') == '1',
+        'min_salary': request.GET.get('min_salary') or '',
+        'max_salary': request.GET.get('max_salary') or '',
+        'sort': sort,
+        'can_rank': ranked,
+        'next_query': next_query,
+        'facets': facets,
+        'active_facets': active_facets,
     }
     return render(request, 'home/index.html', {'template_data': template_data})
 
+def jobs_api(request):
+    """
+    JSON job search: the index() filters and sorts, cursor pagination, and
+    fields= to pick columns. The strong ETag comes from the jobs generation
+    and the query, so revalidating an unchanged page is a 304 that never
+    touches the jobs themselves.
+    """
+    fields = [f for f in request.GET.get('fields', '').split(',') if f] or list(JOB_CARD_FIELDS)
+    unknown = [f for f in fields if f not in JOB_API_FIELDS]
+    if unknown:
+        return JsonResponse({"error": f"Unknown fields: {', '.join(unknown)}"}, status=400)
+    for name in JOB_SALARY_PARAMS:
+        try:
+            _salary_bound(request.GET.get(name))
+        except ValueError:
+            return JsonResponse({"error": f"{name} must be a number"}, status=400)
+
+    etag = job_page_etag(request, JOB_API_PARAMS)
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        page, sort, _, _ = _job_board_page(request, fields)
+        response = JsonResponse({
+            "results": [{name: getattr(job, name) for name in fields} for job in page.items],
+            "sort": sort,
+            "next_cursor": page.next_cursor,
+        })
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+def job_suggestions_api(request):
+    # Search box typeahead, answered from the in-memory job snapshot
+    field = request.GET.get('field')
+    columns = JOB_SEARCH_TYPES.get(field, SNAPSHOT_COLUMNS)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 8)), 20))
+    except (TypeError, ValueError):
+        limit = 8
+    suggestions = job_snapshot.suggest(
+        request.GET.get('q', ''), [c for c in columns if c in SNAPSHOT_COLUMNS], limit
+    )
+    response = JsonResponse({
+        'suggestions': [
+            {'value': value, 'field': column, 'count': count}
+            for column, value, count in suggestions
+        ]
+    })
+    patch_cache_control(response, public=True, max_age=60)
+    return response
+
+def _salary_label(bucket):
+    # '50000-100000' -> '$50k–100k', '200000+' -> '$200k+'
+    if bucket.endswith('+'):
+        return f"${int(bucket[:-1]) // 1000}k+"
+    lower, upper = bucket.split('-')
+    return f"${int(lower) // 1000}k–{int(upper) // 1000}k"
+
+def _job_facet_links(request, counts):
+    # Each facet value narrows the current results to it, so its count is what the link shows
+    sections = []
+    for facet, label in JobFacetCount.Facet.choices:
+        links = []
+        for value, count in counts.get(facet, []):
+            params = request.GET.copy()
+            params.pop('cursor', None)
+            if facet == JobFacetCount.Facet.SALARY:
+                params['min_salary'], params['max_salary'] = salary_bucket_bounds(value)
+                text = _salary_label(value)
+            else:
+                params[facet] = value
+                text = value
+            links.append({'label': text, 'count': count, 'query': params.urlencode()})
+        if links:
+            sections.append({'name': label, 'links': links})
+    return sections
+
 def about(request):
     return render(request, 'home/about.html')
 
@@ -188,6 +431,48 @@ def apply_job(request, id):
 
     return redirect("home.show", id=job.id)
 
+
+# Candidate card field -> the Profile.recruiter_fields key that lets recruiters see it
+CANDIDATE_CARD_FIELDS = {
+    "firstName": "firstName",
+    "lastName": "lastName",
+    "email": "email",
+    "phone": "phone",
+    "location": "location",
+    "skills": "skills",
+    "projects": "projects",
+    "education": "education",
+    "experience": "experience",
+    "resume_url": "resume",
+}
+# A candidate is listed only if one of these is both shared and filled in
+CANDIDATE_HAS_DATA_FIELDS = ("firstName", "lastName", "skills", "location", "experience")
+# Newest profiles first, on a key no edit changes: ordering by updated_at
+# would move a candidate between pages whenever they saved mid-browse
+CANDIDATE_ORDERING = ("-id",)
+# "Only candidates sharing" filter on the candidates page
+CANDIDATE_SHARE_CHOICES = (
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("resume", "Resume"),
+    ("location", "Location"),
+    ("skills", "Skills"),
+    ("experience", "Experience"),
+)
+
+def _shares(key):
+    bit = RECRUITER_FIELD_BITS[key]
+    return Exact(F("recruiter_fields").bitand(bit), bit)
+
+def _shown_to_recruiters(name):
+    return Case(When(_shares(CANDIDATE_CARD_FIELDS[name]), then=F(name)), default=Value(None))
+
+def _candidate_has_visible_data():
+    q = Q()
+    for name in CANDIDATE_HAS_DATA_FIELDS:
+        q |= Q(_shares(CANDIDATE_CARD_FIELDS[name]), **{f"{name}__isnull": False}) & ~Q(**{name: ""})
+    return q
+
 @login_required
 def candidates(request):
     # Only recruiters can view
@@ -196,7 +481,6 @@ def candidates(request):
 
     profiles = (
         Profile.objects
-        .select_related("user")
         .filter(
             is_recruiter=False,
             user__is_active=True,
@@ -213,18 +497,27 @@ def candidates(request):
     search_skills = (request.GET.get("skills") or "").strip()
     search_location = (request.GET.get("location") or "").strip()
     search_name = (request.GET.get("name") or "").strip()
+    search_min_years = (request.GET.get("min_years") or "").strip()
     filter_job_id = request.GET.get("job")
+    shares = [key for key in request.GET.getlist("shares") if key in RECRUITER_FIELD_BITS]
 
+    fuzzy = request.GET.get("fuzzy") == "1"
     if search_skills:
-        profiles = profiles.filter(skills__icontains=search_skills)
+        skills_query = fuzzy_groups(search_skills, [SearchTrigram.Source.PROFILE_SKILLS]) if fuzzy else search_skills
+        profiles = filter_profiles_by_keywords(profiles, skills_query, columns=("skills",))
     if search_location:
-        profiles = profiles.filter(location__icontains=search_location)
+        # Word prefixes through the full-text index, as the job board's location search does
+        profiles = filter_profiles_by_keywords(profiles, search_location, columns=("location",))
     if search_name:
         profiles = profiles.filter(
             models.Q(firstName__icontains=search_name) |
             models.Q(lastName__icontains=search_name) |
             models.Q(user__username__icontains=search_name)
         )
+    if search_min_years.isdigit() and int(search_min_years) > 0:
+        profiles = profiles.filter(years_experience__gte=int(search_min_years))
+    if shares:
+        profiles = profiles.filter(shares_recruiter_fields(*shares))
 
     # Filter by job applicants
     filtered_by_job = None
@@ -237,97 +530,112 @@ def candidates(request):
         except Job.DoesNotExist:
             pass
 
-    safe_profiles = []
-    for profile in profiles:
-        if getattr(Profile, "Visibility", None) and profile.visibility == Profile.Visibility.PRIVATE:
-            continue
-
-        # Skip if no meaningful data to show
-        has_data = any([
-            getattr(profile, "show_firstName_to_recruiters", False) and profile.firstName,
-            getattr(profile, "show_lastName_to_recruiters", False) and profile.lastName,
-            getattr(profile, "show_skills_to_recruiters", False) and profile.skills,
-            getattr(profile, "show_location_to_recruiters", False) and profile.location,
-            getattr(profile, "show_experience_to_recruiters", False) and profile.experience,
-        ])
-
-        if not has_data:
-            continue
-
-        safe_profiles.append({
-            "firstName": profile.firstName if getattr(profile, "show_firstName_to_recruiters", False) else None,
-            "lastName": profile.lastName if getattr(profile, "show_lastName_to_recruiters", False) else None,
-            "email": profile.email if getattr(profile, "show_email_to_recruiters", False) else None,
-            "phone": profile.phone if getattr(profile, "show_phone_to_recruiters", False) else None,
-            "location": profile.location if getattr(profile, "show_location_to_recruiters", False) else None,
-            "skills": profile.skills if getattr(profile, "show_skills_to_recruiters", False) else None,
-            "projects": profile.projects if getattr(profile, "show_projects_to_recruiters", False) else None,
-            "education": profile.education if getattr(profile, "show_education_to_recruiters", False) else None,
-            "experience": profile.experience if getattr(profile, "show_experience_to_recruiters", False) else None,
-            "resume_url": profile.resume_url if getattr(profile, "show_resume_to_recruiters", False) else None,
-            "username": (profile.user.username if profile.user and profile.user.username else None),
-        })
+    # Privacy and "anything to show" are SQL predicates; masked columns come
+    # back as Case/When values, one keyset page at a time
+    profiles = profiles.exclude(visibility=Profile.Visibility.PRIVATE).filter(_candidate_has_visible_data())
+    rows = profiles.values(
+        "id", "user__username",
+        **{f"shown_{name}": _shown_to_recruiters(name) for name in CANDIDATE_CARD_FIELDS},
+    )
+    page = paginate_keyset(rows, CANDIDATE_ORDERING, request.GET.get("cursor"), page_size_from(request))
+    safe_profiles = [
+        dict({name: row[f"shown_{name}"] for name in CANDIDATE_CARD_FIELDS}, username=row["user__username"])
+        for row in page.items
+    ]
+
+    next_query = None
+    if page.next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = page.next_cursor
+        next_query = params.urlencode()
 
     context = {
         "profiles": safe_profiles,
+        "next_query": next_query,
         "search_skills": search_skills,
+        "fuzzy": fuzzy,
         "search_location": search_location,
         "search_name": search_name,
+        "search_min_years": search_min_years,
         "recruiter_jobs": recruiter_jobs,
         "filter_job_id": filter_job_id,
         "filtered_by_job": filtered_by_job,
+        "share_choices": CANDIDATE_SHARE_CHOICES,
+        "shares": shares,
     }
     return render(request, "home/candidates.html", context)
 
 
-# PSEUDOCODE: View showing recommended candidates for a specific job (recruiter-only)
-# Fetches CandidateRecommendation records for the job, filters by score threshold
-# Interacts with: CandidateRecommendation model, Profile model for candidate data
-@login_required
-def recruiter_recommendations(request, job_id):
-    job = get_object_or_404(Job, id=job_id)
+REC_ORDERING = ("-match_score", "-created_at", "-id")
 
-    # Only job owner can view recommendations
-    if job.user != request.user:
-        return render(request, 'home/forbidden.html', status=403)
 
-    # Get min score filter (default: 10)
-    min_score = int(request.GET.get('min_score', 10))
+def _min_score(request):
+    try:
+        return max(0, min(int(request.GET.get('min_score', 10)), 100))
+    except (TypeError, ValueError):
+        return 10
+
 
-    # Fetch recommendations, exclude dismissed ones
+def _candidate_recommendation_page(request, job):
+    # Fetch one keyset page of recommendations, exclude dismissed/private ones.
+    # Ordered to match the (job, -match_score) index so each page is a range seek.
     recommendations = (
         CandidateRecommendation.objects
-        .filter(job=job, is_dismissed=False, match_score__gte=min_score)
+        .filter(job=job, is_dismissed=False, match_score__gte=_min_score(request))
+        .exclude(candidate__profile__visibility=Profile.Visibility.PRIVATE)
         .select_related('candidate__profile')
-        .order_by('-match_score', '-created_at')
     )
+    page = paginate_keyset(recommendations, REC_ORDERING, request.GET.get('cursor'), page_size_from(request))
 
     # Build safe candidate data respecting privacy settings
-    safe_recommendations = []
-    for rec in recommendations:
-        profile = rec.candidate.profile
-        if profile.visibility == Profile.Visibility.PRIVATE:
-            continue
-
-        safe_recommendations.append({
+    page.items = [
+        {
             'id': rec.id,
             'username': rec.candidate.username,
             'match_score': rec.match_score,
-            'firstName': profile.firstName if profile.show_firstName_to_recruiters else None,
-            'lastName': profile.lastName if profile.show_lastName_to_recruiters else None,
-            'location': profile.location if profile.show_location_to_recruiters else None,
-            'skills': profile.skills if profile.show_skills_to_recruiters else None,
-            'experience': profile.experience if profile.show_experience_to_recruiters else None,
-        })
+            **{
+                key: getattr(profile, key) if profile.shows_to_recruiters(key) else None
+                for key in ('firstName', 'lastName', 'location', 'skills', 'experience')
+            },
+        }
+        for rec in page.items
+        for profile in [rec.candidate.profile]
+    ]
+    return page
+
+
+# PSEUDOCODE: View showing recommended candidates for a specific job (recruiter-only)
+# Fetches CandidateRecommendation records for the job, filters by score threshold
+# Interacts with: CandidateRecommendation model, Profile model for candidate data
+@login_required
+def recruiter_recommendations(request, job_id):
+    job = get_object_or_404(Job, id=job_id)
+
+    # Only job owner can view recommendations
+    if job.user != request.user:
+        return render(request, 'home/forbidden.html', status=403)
 
+    page = _candidate_recommendation_page(request, job)
     context = {
         'job': job,
-        'recommendations': safe_recommendations,
-        'min_score': min_score,
+        'recommendations': page.items,
+        'next_cursor': page.next_cursor,
+        'min_score': _min_score(request),
     }
     return render(request, 'home/recruiter_recommendations.html', context)
 
 
+# JSON variant of recruiter_recommendations for infinite scroll
+@login_required
+def recruiter_recommendations_api(request, job_id):
+    job = get_object_or_404(Job, id=job_id)
+    if job.user != request.user:
+        return JsonResponse({"error": "Forbidden"}, status=403)
+
+    page = _candidate_recommendation_page(request, job)
+    return JsonResponse({"results": page.items, "next_cursor": page.next_cursor})
+
+
 # PSEUDOCODE: Dismisses a candidate recommendation (recruiter action)
 # Marks CandidateRecommendation as dismissed, preventing it from appearing in lists
 # Interacts with: CandidateRecommendation model
@@ -347,29 +655,52 @@ def dismiss_candidate_recommendation(request, rec_id):
     return redirect('home.recruiter_recs', job_id=rec.job.id)
 
 
-# PSEUDOCODE: View showing recommended jobs for job seeker based on their profile
-# Fetches JobRecommendation records for the user, excludes dismissed/applied jobs
-# Interacts with: JobRecommendation model, Job model for posting data
-@login_required
-def job_recommendations(request):
-    # Get min score filter (default: 10)
-    min_score = int(request.GET.get('min_score', 10))
-
-    # Fetch recommendations, exclude dismissed ones
+def _job_recommendation_page(request):
+    # Fetch one keyset page of recommendations, exclude dismissed ones.
+    # Ordered to match the (candidate, -match_score) index.
     recommendations = (
         JobRecommendation.objects
-        .filter(candidate=request.user, is_dismissed=False, match_score__gte=min_score)
+        .filter(candidate=request.user, is_dismissed=False, match_score__gte=_min_score(request))
         .select_related('job__user')
-        .order_by('-match_score', '-created_at')
     )
+    return paginate_keyset(recommendations, REC_ORDERING, request.GET.get('cursor'), page_size_from(request))
+
 
+# PSEUDOCODE: View showing recommended jobs for job seeker based on their profile
+# Fetches JobRecommendation records for the user, excludes dismissed/applied jobs
+# Interacts with: JobRecommendation model, Job model for posting data
+@login_required
+def job_recommendations(request):
+    page = _job_recommendation_page(request)
     context = {
-        'recommendations': recommendations,
-        'min_score': min_score,
+        'recommendations': page.items,
+        'next_cursor': page.next_cursor,
+        'min_score': _min_score(request),
     }
     return render(request, 'home/job_recommendations.html', context)
 
 
+# JSON variant of job_recommendations for infinite scroll
+@login_required
+def job_recommendations_api(request):
+    page = _job_recommendation_page(request)
+    results = [
+        {
+            'id': rec.id,
+            'match_score': rec.match_score,
+            'job': {
+                'id': rec.job.id,
+                'title': rec.job.title,
+                'category': rec.job.category,
+                'location': rec.job.location,
+                'salary': rec.job.salary,
+            },
+        }
+        for rec in page.items
+    ]
+    return JsonResponse({"results": results, "next_cursor": page.next_cursor})
+
+
 # PSEUDOCODE: Dismisses a job recommendation (job seeker action)
 # Marks JobRecommendation as dismissed, preventing it from appearing in lists
 # Interacts with: JobRecommendation model
@@ -462,10 +793,15 @@ def pipeline_board(request, job_id=None):
     elif not request.user.is_staff:
         qs = qs.filter(job__user=request.user)
 
-    columns = []
-    for value, label in PIPELINE_COLUMNS:
-        items = [a for a in qs if a.status == value]
-        columns.append({"value": value, "label": label, "items": items})
+    # Status-major order reads a single job's board straight off its
+    # (job, status, -created_at) index
+    by_status = {value: [] for value, _ in PIPELINE_COLUMNS}
+    for a in qs.order_by("status", "-created_at"):
+        by_status.setdefault(a.status, []).append(a)
+    columns = [
+        {"value": value, "label": label, "items": by_status[value]}
+        for value, label in PIPELINE_COLUMNS
+    ]
 
     ctx = {
         "columns": columns,
@@ -545,31 +881,122 @@ def saved_search_toggle(request, pk):
     s.save(update_fields=["is_active"])
     return redirect("saved_search_list")
 
-@login_required
-def saved_search_matches(request, pk):
-    if not _must_be_recruiter(request.user):
-        return HttpResponseForbidden("Recruiters only")
-    s = get_object_or_404(SavedCandidateSearch, pk=pk, owner=request.user)
+MATCH_ORDERING = ("seen", "-matched_at", "-id")
+
+def _saved_search_match_page(request, s):
+    # Unseen first, newest first: walks the (search, seen, -matched_at) index.
+    # Only the columns the list shows are loaded, not whole Profile rows.
     matches = (
         SavedCandidateMatch.objects
         .filter(search=s)
         .select_related("candidate", "candidate__profile")
-        .order_by("-matched_at")
+        .only(
+            "id", "seen", "matched_at", "candidate",
+            "candidate__username",
+            "candidate__profile__user", "candidate__profile__headline",
+            "candidate__profile__location", "candidate__profile__skills",
+            "candidate__profile__visibility", "candidate__profile__recruiter_fields",
+        )
     )
-    return render(request, "home/saved_search_matches.html", {"search": s, "matches": matches})
+    page = paginate_keyset(matches, MATCH_ORDERING, request.GET.get("cursor"), page_size_from(request))
+    # What the candidate lets recruiters see; hidden fields come back as None
+    for m in page.items:
+        profile = m.candidate.profile
+        m.shown = {
+            "headline": profile.headline if profile.visibility != Profile.Visibility.PRIVATE else None,
+            **{key: getattr(profile, key) if profile.shows_to_recruiters(key) else None for key in ("location", "skills")},
+        }
+    return page
+
+@login_required
+def saved_search_matches(request, pk):
+    if not _must_be_recruiter(request.user):
+        return HttpResponseForbidden("Recruiters only")
+    s = get_object_or_404(SavedCandidateSearch, pk=pk, owner=request.user)
+    page = _saved_search_match_page(request, s)
+    return render(request, "home/saved_search_matches.html", {
+        "search": s,
+        "matches": page.items,
+        "next_cursor": page.next_cursor,
+    })
+
+# JSON variant of saved_search_matches for incremental loading
+@login_required
+def saved_search_matches_api(request, pk):
+    if not _must_be_recruiter(request.user):
+        return JsonResponse({"error": "Recruiters only"}, status=403)
+    s = get_object_or_404(SavedCandidateSearch, pk=pk, owner=request.user)
+    page = _saved_search_match_page(request, s)
+    results = [
+        {
+            "id": m.id,
+            "username": m.candidate.username,
+            **m.shown,
+            "matched_at": m.matched_at,
+            "seen": m.seen,
+        }
+        for m in page.items
+    ]
+    return JsonResponse({"results": results, "next_cursor": page.next_cursor})
 
 @login_required
 def saved_search_unread_count(request):
     if not _must_be_recruiter(request.user):
         return JsonResponse({"count": 0})
-    count = SavedCandidateMatch.objects.filter(search__owner=request.user, seen=False).count()
-    return JsonResponse({"count": count})
+    # Single primary-key read of the denormalized counter; unchanged counts
+    # revalidate to an empty 304 so idle badge polls cost almost nothing
+    count = unread_count_for(request.user.id)
+    etag = f'"unread-{count}"'
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = JsonResponse({"count": count})
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+SSE_HEARTBEAT_SECONDS = 25
+
+async def saved_search_events(request):
+    """
+    Server-sent events stream of the unread badge count, one connection per
+    tab. Needs the ASGI application (jobplatform/asgi.py); under WSGI it
+    answers 204 so the browser stops reconnecting and falls back to polling.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    user = await request.auser()
+    if not await sync_to_async(_must_be_recruiter)(user):
+        return HttpResponse(status=204)
+    count = await sync_to_async(unread_count_for)(user.id)
+
+    async def stream():
+        # The notifier also publishes counts other processes change, batched per process
+        queue = notifier.subscribe(user.id, count)
+        try:
+            yield f"retry: 15000\ndata: {json.dumps({'count': count})}\n\n"
+            while True:
+                try:
+                    latest = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                while not queue.empty():
+                    latest = queue.get_nowait()
+                yield f"data: {json.dumps({'count': latest})}\n\n"
+        finally:
+            notifier.unsubscribe(user.id, queue)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 @login_required
 def saved_search_mark_seen(request):
     if not _must_be_recruiter(request.user):
         return JsonResponse({"ok": False})
-    SavedCandidateMatch.objects.filter(search__owner=request.user, seen=False).update(seen=True)
+    mark_all_seen(request.user.id)
     return JsonResponse({"ok": True})
 
 # Location Map Page: Render map template with Google Maps API key for user
@@ -583,16 +1010,6 @@ def job_map(request):
 # Location Map Page: API endpoint to filter and return job data based on location/distance
 @login_required
 def map_data_api(request):
-    # Location Map Page: Calculate geographic distance between two points using Haversine formula
-    def haversine(lat1, lon1, lat2, lon2):
-        R = 3958.8  # Earth radius in miles
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        return R * c
-
     # Location Map Page: Parse user filters from request parameters
     max_distance = float(request.GET.get("distance") or math.inf)
     user_location = request.GET.get("location", None)
@@ -606,20 +1023,17 @@ def map_data_api(request):
 
     jobs_by_city = OrderedDict()
 
-    # Location Map Page: Loop through jobs, filter by distance, group by city
-    for job in Job.objects.order_by("location", "date"):
-        # Must have coordinates (from the geocoding process at job creation)
-        if job.latitude is None or job.longitude is None:
-            continue
+    # Location Map Page: Distance filtering runs over the in-memory snapshot (jobs without
+    # coordinates are skipped there); only the jobs within range are fetched
+    job_ids = job_snapshot.located_within(user_lat, user_lng, max_distance)
+    jobs = Job.objects.only(
+        "id", "title", "description", "salary", "date", "category", "location", "latitude", "longitude"
+    ).in_bulk(job_ids)
 
+    # Location Map Page: Group jobs by city
+    for job in sorted(jobs.values(), key=lambda j: (j.location, j.date)):
         lat, lng = job.latitude, job.longitude
 
-        # Location Map Page: Apply distance filtering if user specified location
-        if user_lat is not None and user_lng is not None:
-            curr_distance = haversine(user_lat, user_lng, lat, lng)
-            if curr_distance > max_distance:
-                continue
-
         city = job.location  # Group jobs by the text location
 
         # Location Map Page: Group jobs by city for marker clustering
@@ -796,21 +1210,3 @@ def applicant_map_data_api(request):
         applicant_locations[loc]['count'] += 1
     
     return JsonResponse(list(applicant_locations.values()), safe=False)
-
-# Location Map Page: Convert city/address to latitude/longitude using Google Geocoding API
-def geocode_location(address):
-    if not address:
-        return None, None
-
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {"address": address, "key": settings.GOOGLE_MAPS_API_KEY}
-
-    response = requests.get(url, params=params).json()
-    print("Geocoding response for", address, ":", response)  # <-- add this
-
-    if response["status"] == "OK":
-        loc = response["results"][0]["geometry"]["location"]
-        return float(loc["lat"]), float(loc["lng"])
-    else:
-        print("Geocoding failed:", response["status"], response.get("error_message"))
-        return None, None
\ No newline at end of file
@@ -2,6 +2,9 @@
 ASGI config for jobplatform project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn jobplatform.asgi:application``)
+to enable the saved-search notification stream at /notifications/events;
+under WSGI the badge falls back to polling.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
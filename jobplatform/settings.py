@@ -136,3 +136,11 @@ MEDIA_URL = '/media/'
 
 #add from google maps api key
 GOOGLE_MAPS_API_KEY = config('GOOGLE_API_KEY')
+
+# Re-evaluate saved candidate searches on every Profile save. High-write
+# deployments can turn this off and schedule `manage.py run_saved_searches`.
+SAVED_SEARCH_REINDEX_ON_PROFILE_SAVE = True
+
+# Seconds an anonymous job board page stays in the cache. Any job change
+# invalidates it sooner; 0 disables the page cache.
+JOB_PAGE_CACHE_SECONDS = 300
@@ -27,6 +27,10 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            # Marking a conversation's unread messages as read
+            models.Index(fields=["conversation", "read_at"]),
+        ]
 
     def mark_read(self):
         if not self.read_at:
@@ -59,6 +63,10 @@ class DirectMessage(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            # Marking a conversation's unread messages as read
+            models.Index(fields=["conversation", "read_at"]),
+        ]
 
     def mark_read(self):
         if not self.read_at:
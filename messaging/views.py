@@ -95,10 +95,10 @@ def send_direct_message(request, username):
 
 @login_required
 def inbox(request):
-    apps = Application.objects.filter(
-        models.Q(applicant=request.user) | models.Q(job__user=request.user)
-    ).select_related("job", "applicant")
-    convs = Conversation.objects.filter(application__in=apps).select_related(
+    # One indexed lookup per side; an OR across the join would scan every application
+    applied = Application.objects.filter(applicant=request.user).order_by().values("pk")
+    received = Application.objects.filter(job__user=request.user).order_by().values("pk")
+    convs = Conversation.objects.filter(application__in=applied.union(received)).select_related(
         "application__job", "application__applicant"
     )
 